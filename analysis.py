@@ -0,0 +1,169 @@
+#====================================================================================================#
+# Imports:                                                                                           #
+#====================================================================================================#
+
+import time
+import random
+from collections import deque
+from typing import Iterable, Iterator, List, NamedTuple, Tuple
+
+import game
+
+
+#====================================================================================================#
+# Position Analysis:                                                                                 #
+#====================================================================================================#
+
+class Analysis(NamedTuple):
+    '''What a player plays in a position and why.'''
+    move:    int                  # the column played (None if the board is full)
+    scores:  Tuple[float, ...]    # score of every column for the player to move (None if full or not scored)
+    source:  str                  # 'win', 'block', 'book' or 'search' (None if the player does not tell)
+    depth:   int                  # depth of the last completed search iteration in plies
+    nodes:   int                  # nodes searched
+    seconds: float                # time of the call
+
+def analyze_chunk(job:Tuple[str, int, int, int, int, float, List[Tuple[Tuple[Tuple[int, ...], ...], int]]]) -> List[Analysis]:
+    '''Analyze a chunk of positions one after the other (the function of the worker processes).
+
+        The player keeps one memory per board size and side to move for the whole chunk, so its
+        precomputed tables (zobrist keys, line index, transposition table) are built once per chunk,
+        and the positions of a game reuse the table of the previous position with the same side to
+        move (scores are stored from its point of view).
+
+        Arguments:
+            job (tuple): name of the player, seed of the random state, number of rows (None for
+                         square boards), target, search depth in plies, time budget in seconds and
+                         the positions as `(board, player to move)`.
+    '''
+    name, seed, n_rows, n_target, depth, budget, positions = job
+    play     = game._players[name]
+    context  = game.accepts_context(play)
+    analysis = game.accepts_keyword(play, 'analysis')
+    memories = {}
+    results  = []
+
+    random.seed(seed)
+    for board, player in positions:
+        n = len(board)
+        rows = n_rows if n_rows is not None else n
+        choices = tuple(col for col in range(n) if len(board[col]) < rows)
+        if not choices:
+            results.append(Analysis(None, (None,) * n, None, 0, 0, 0.))
+            continue
+
+        # players that support it are asked for the scores of all columns (see play of player_ai_new):
+        memory = memories.get((rows, n, player), {})
+        kwargs = {'context': game.GameContext(rows, n, n_target, 0, float('inf'), 0)} if context else {}
+        if analysis: kwargs['analysis'] = (depth, budget)
+
+        t = time.perf_counter()
+        move, memory = play(board, choices, player, memory, **kwargs)
+        seconds = time.perf_counter() - t
+        memories[rows, n, player] = memory
+
+        stats = memory.get('stats', {}) if isinstance(memory, dict) else {}
+        scores = stats.get('scores')
+        results.append(Analysis(
+            move,
+            tuple(scores) if scores is not None else (None,) * n,
+            stats.get('source'),
+            stats.get('depth', 0),
+            stats.get('nodes', 0),
+            seconds
+        ))
+
+    return results
+
+def analyze(positions:Iterable[Tuple[List[List[int]], int]], n_target:int, name:str='ai_new', depth:int=4, budget:float=None, workers:int=1, chunk_size:int=256, seed:int=0, paths:List[str]=None, n_rows:int=None) -> Iterator[Analysis]:
+    '''Analyze many positions with a player: the move it plays, the score of every column and the
+       statistics of its search.
+
+        Positions are cut into chunks of `chunk_size`, which are analyzed by a pool of worker
+        processes. Each chunk starts with fresh player memory and its own seed, so with a fixed depth
+        and no budget the results do not depend on the number of workers. The positions are drawn
+        lazily and the results come back in order.
+
+        Players that take the keyword argument `analysis` get `(depth, budget)` in it and report the
+        score of every column: `player_ai_new` scores them with a full window search (slower than
+        choosing a move, where all but the best move only get a bound) and `player_ai` with its
+        heuristic. Other players only report their moves.
+
+        Arguments:
+            positions (iterable): `(board, player to move)` with the board as a list of columns of
+                                  player ids from the bottom
+            n_target       (int): number of consecutive marks needed to win
+            name           (str): name of the player as returned by `import_players`
+            depth          (int): search depth in plies (None to search until the budget is used up)
+            budget       (float): time budget per position in seconds (None: no limit if a depth is
+                                  given, the player's own budget otherwise)
+            workers        (int): number of worker processes (1 analyzes all chunks in this process)
+            chunk_size     (int): positions per chunk
+            seed           (int): seed from which the seeds of all chunks are drawn
+            paths         (list): directories searched for players (see `discover_players`)
+            n_rows         (int): number of rows of all boards (None for square boards, like in the
+                                  game)
+
+        Returns (Iterator[Analysis]): one analysis per position.
+    '''
+    rng = random.Random(seed)
+
+    def jobs():
+        chunk = []
+        for board, player in positions:
+            chunk.append((tuple(map(tuple, board)), player))
+            if len(chunk) == chunk_size:
+                yield (name, rng.getrandbits(32), n_rows, n_target, depth, budget, chunk)
+                chunk = []
+        if chunk:
+            yield (name, rng.getrandbits(32), n_rows, n_target, depth, budget, chunk)
+
+    for results in game._lazy_map(analyze_chunk, jobs(), workers, paths):
+        yield from results
+
+
+#====================================================================================================#
+# Main Function:                                                                                     #
+#====================================================================================================#
+
+if __name__ == "__main__":
+    import os
+    import argparse
+    from itertools import islice
+    from selfplay import read_shards
+
+    parser = argparse.ArgumentParser(description='Analyze the positions of self-play shards (see selfplay.py) with a player.')
+    parser.add_argument('directory',    help='directory of the shards')
+    parser.add_argument('--player',     default='ai_new', help='name of the player')
+    parser.add_argument('--target',     type=int, required=True, help='only analyze positions with this target')
+    parser.add_argument('--size',       type=int, help='only analyze positions with this number of columns')
+    parser.add_argument('--rows',       type=int, help='only analyze positions with this number of rows (default: square boards)')
+    parser.add_argument('--depth',      type=int, default=4, help='search depth in plies (0 to search for the budget)')
+    parser.add_argument('--budget',     type=float, help='time budget per position in seconds')
+    parser.add_argument('--limit',      type=int, default=1000, help='number of positions to analyze')
+    parser.add_argument('--workers',    type=int, default=os.cpu_count() or 1, help='number of worker processes')
+    parser.add_argument('--chunk-size', type=int, default=256, help='positions per chunk')
+    parser.add_argument('--path',       action='append', help='additional directory with player scripts (repeatable)')
+    args = parser.parse_args()
+
+    # the recorded moves of the positions drawn but not analyzed yet:
+    recorded = deque()
+    def positions():
+        for p in read_shards(args.directory):
+            if p.n_target != args.target or p.n_rows != (args.rows or p.n_cols) or args.size not in (None, p.n_cols): continue
+            recorded.append(p.move)
+            yield p.board, p.player
+
+    paths = ['.'] + args.path if args.path else None
+    start = time.perf_counter()
+    n, agree, nodes, sources = 0, 0, 0, {}
+    for a in islice(analyze(positions(), args.target, args.player, args.depth or None, args.budget, args.workers, args.chunk_size, paths=paths, n_rows=args.rows), args.limit):
+        n     += 1
+        agree += a.move == recorded.popleft()
+        nodes += a.nodes
+        sources[a.source] = sources.get(a.source, 0) + 1
+    seconds = time.perf_counter() - start
+
+    print(f'{n:d} positions in {seconds:.1f} s ({n / max(seconds, 1e-9):.1f} per second, {nodes / max(seconds, 1e-9):.0f} nodes per second)')
+    print(f'{agree:d} moves ({agree / max(n, 1) * 100.:.1f} %) agree with the recorded games')
+    print('sources: ' + ', '.join(f'{source} {count:d}' for source, count in sorted(sources.items(), key=lambda s: -s[1])))
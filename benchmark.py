@@ -0,0 +1,181 @@
+#====================================================================================================#
+# Imports:                                                                                           #
+#====================================================================================================#
+
+import json
+import math
+import random
+import time
+import tracemalloc
+from typing import Any, Dict, List, Tuple
+
+from game import TicTacToe, accepts_context, import_players, player_callable
+
+
+#====================================================================================================#
+# Position Corpus:                                                                                   #
+#====================================================================================================#
+
+def make_corpus(sizes:List[int], n_positions:int, seed:int=0) -> List[Tuple[int, int, TicTacToe, int]]:
+    '''Create a fixed set of positions for every board size and target.
+
+        Positions come from random games that are stopped after a random number of moves, before
+        anyone has won and while there are still free columns.
+
+        Arguments:
+            sizes      (List[int]): board sizes n (n x n boards, targets 3..n)
+            n_positions      (int): positions per size and target
+            seed             (int): seed of the corpus
+
+        Returns (List[Tuple[int, int, TicTacToe, int]]): size, target, game and player to move.
+    '''
+    rng = random.Random(seed)
+    corpus = []
+
+    for size in sizes:
+        for target in range(3, size + 1):
+            for _ in range(n_positions):
+                game  = TicTacToe(n_rows=size, n_cols=size, n_target=target, silent=True)
+                moves = rng.randrange(size * size - 1)
+                player = rng.randint(0, 1)
+
+                for _ in range(moves):
+                    col = rng.choice(game.state.choices())
+                    game.push(col, player)
+                    if game.check_win() >= 0:
+                        game.pop()
+                        break
+                    player = 1 - player
+
+                corpus.append((size, target, game, player))
+
+    return corpus
+
+
+#====================================================================================================#
+# Measurement:                                                                                       #
+#====================================================================================================#
+
+def percentile(values:List[float], q:float) -> float:
+    '''Nearest rank percentile (q in 0..100) of a list of values.'''
+    if not values: return 0.
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, math.ceil(q / 100. * len(values)) - 1))]
+
+def measure(play:player_callable, corpus:List[Tuple[int, int, TicTacToe, int]], memory:bool=True) -> Dict[str, Any]:
+    '''Replay every position of the corpus once through a player (with fresh memory, like the first
+       move of a game) and collect its statistics.
+
+        Arguments:
+            play (player_callable): the player's `play` function.
+            corpus          (list): positions created by `make_corpus`.
+            memory          (bool): if True, measure the peak memory in a second pass (slow).
+    '''
+    times, nodes, per_size = [], 0, {}
+    context = accepts_context(play)
+
+    for size, target, game, player in corpus:
+        kwargs = {'context': game.context()} if context else {}
+        t = time.perf_counter()
+        _, mem = play(game.view, tuple(game.state.choices()), player, None, **kwargs)
+        t = time.perf_counter() - t
+
+        times.append(t)
+        per_size.setdefault(f'{size:d}x{size:d}/{target:d}', []).append(t)
+        if isinstance(mem, dict) and isinstance(mem.get('stats'), dict):
+            nodes += mem['stats'].get('nodes', 0)
+
+    result = {
+        'moves':   len(times),
+        'mean_ms': sum(times) / max(len(times), 1) * 1000.,
+        'p50_ms':  percentile(times, 50) * 1000.,
+        'p95_ms':  percentile(times, 95) * 1000.,
+        'p99_ms':  percentile(times, 99) * 1000.,
+        'max_ms':  max(times, default=0.) * 1000.,
+        'nodes':   nodes,
+        'nodes_per_s': nodes / sum(times) if sum(times) > 0 else 0.,
+        'per_size': {k: {'p50_ms': percentile(v, 50) * 1000., 'p95_ms': percentile(v, 95) * 1000.} for k, v in per_size.items()}
+    }
+
+    if memory:
+        peak = 0
+        tracemalloc.start()
+        for size, target, game, player in corpus:
+            tracemalloc.reset_peak()
+            play(game.view, tuple(game.state.choices()), player, None, **({'context': game.context()} if context else {}))
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        result['peak_kb'] = peak / 1024.
+
+    return result
+
+def compare(results:Dict[str, Any], baseline:Dict[str, Any], tolerance:float=.2, min_delta_ms:float=1.) -> List[str]:
+    '''List all regressions against a baseline: latency percentiles (by at least `min_delta_ms`) or
+       peak memory more than `tolerance` above, or node throughput more than `tolerance` below the
+       baseline.'''
+    regressions = []
+
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None: continue
+
+        for key in ('p50_ms', 'p95_ms', 'p99_ms', 'peak_kb'):
+            if key not in result or key not in base: continue
+            if key.endswith('_ms') and result[key] - base[key] < min_delta_ms: continue
+            if result[key] > base[key] * (1. + tolerance):
+                regressions.append(f'{name}: {key} {result[key]:.2f} > {base[key]:.2f}')
+
+        if base.get('nodes_per_s', 0) > 0 and result['nodes_per_s'] < base['nodes_per_s'] * (1. - tolerance):
+            regressions.append(f'{name}: nodes_per_s {result["nodes_per_s"]:.0f} < {base["nodes_per_s"]:.0f}')
+
+    return regressions
+
+
+#====================================================================================================#
+# Main Function:                                                                                     #
+#====================================================================================================#
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description='Benchmark the moves of all players.')
+    parser.add_argument('--players',   nargs='+', help='players to benchmark (default: all but --exclude)')
+    parser.add_argument('--exclude',   nargs='+', default=['human'], help='players to skip')
+    parser.add_argument('--sizes',     type=int, nargs='+', default=list(range(3, 11)), help='board sizes')
+    parser.add_argument('--positions', type=int, default=3, help='positions per size and target')
+    parser.add_argument('--seed',      type=int, default=0, help='seed of the position corpus')
+    parser.add_argument('--no-memory', action='store_true', help='skip the peak memory pass')
+    parser.add_argument('--out',       help='write the results as JSON to this file')
+    parser.add_argument('--baseline',  help='JSON results to compare against')
+    parser.add_argument('--tolerance', type=float, default=.2, help='allowed relative regression')
+    parser.add_argument('--min-delta', type=float, default=1., help='ignore latency regressions below this many ms')
+    args = parser.parse_args()
+
+    players = import_players()
+    names = args.players if args.players else [name for name in sorted(players) if name not in args.exclude]
+    corpus = make_corpus(args.sizes, args.positions, args.seed)
+
+    # benchmark all players:
+    results = {}
+    for name in names:
+        try: play = players[name]
+        except Exception as e:
+            print(f'Unable to load player "{name}": {e}')
+            continue
+
+        results[name] = r = measure(play, corpus, memory=not args.no_memory)
+        print(f'{name:>12s}: p50 {r["p50_ms"]:8.2f} ms   p95 {r["p95_ms"]:8.2f} ms   p99 {r["p99_ms"]:8.2f} ms   '
+              f'peak {r.get("peak_kb", 0.):8.1f} kB   nodes {r["nodes"]:8d} ({r["nodes_per_s"]:.0f}/s)')
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({'seed': args.seed, 'sizes': args.sizes, 'positions': args.positions, 'results': results}, f, indent=2)
+
+    # compare with the baseline:
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)['results'], args.tolerance, args.min_delta)
+
+        for regression in regressions: print(f'Regression: {regression}')
+        sys.exit(1 if regressions else 0)
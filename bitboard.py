@@ -0,0 +1,118 @@
+#====================================================================================================#
+# Imports:                                                                                           #
+#====================================================================================================#
+
+from typing import List, Tuple
+
+from lines import line_index
+
+
+#====================================================================================================#
+# Bitboard Class:                                                                                    #
+#====================================================================================================#
+
+class Bitboard:
+    def __init__(self, n_rows:int=5, n_cols:int=5, n_target:int=5) -> None:
+        '''Compact board state storing one integer bitmask per player.
+
+            Cells are stored column by column with `n_rows + 1` bits per column. The extra bit on
+            top of each column is never set, which keeps vertical and diagonal runs from wrapping
+            around into the neighbouring column. Bit positions match the cells of `lines.LineIndex`.
+            The bitmasks of the board mirrored left to right are kept as well (see `canonical_key`).
+
+            Arguments:
+                n_rows    (int): number of rows of the board
+                n_cols    (int): number of columns of the board
+                n_target  (int): number of adjacent pieces needed to win
+        '''
+        self.n_rows  = n_rows
+        self.n_cols  = n_cols
+        self.target  = n_target
+        self.height  = n_rows + 1
+        self.shifts  = (1, self.height, self.height + 1, self.height - 1)
+        self.bottom  = sum(1 << (c * self.height) for c in range(n_cols))
+        self.bits    = [0, 0]
+        self.mirror  = [0, 0]
+        self.heights = [0] * n_cols
+        self.moves   = []
+
+    @classmethod
+    def from_columns(cls, board:List[List[int]], n_rows:int, n_target:int) -> 'Bitboard':
+        '''Build a bitboard from a list of columns (the move order is lost, so `pop` is not possible).'''
+        state = cls(n_rows, len(board), n_target)
+        for col, pieces in enumerate(board):
+            for row, piece in enumerate(pieces):
+                state.bits[piece]   |= 1 << (col * state.height + row)
+                state.mirror[piece] |= 1 << ((state.n_cols - 1 - col) * state.height + row)
+            state.heights[col] = len(pieces)
+        return state
+
+    def key(self, player:int) -> int:
+        '''Unique key of the position as seen by `player` (the same for swapped colors). Adding the
+           bottom row to the occupied cells sets exactly the bit above each column's top piece.'''
+        return self.bits[player] + (self.bits[0] | self.bits[1]) + self.bottom
+
+    def mirror_key(self, player:int) -> int:
+        '''Key of the position mirrored left to right (see `key`).'''
+        return self.mirror[player] + (self.mirror[0] | self.mirror[1]) + self.bottom
+
+    def canonical_key(self, player:int) -> Tuple[int, bool]:
+        '''The smaller of the keys of the position and of its mirror image, and whether it is the
+           key of the mirror image. Gravity works the same in every column, so mirrored positions
+           have mirrored best moves and a table keyed by canonical keys stores both of them once.
+           Moves stored with a mirrored key are mirrored too (`n_cols - 1 - col`).'''
+        key, mirror = self.key(player), self.mirror_key(player)
+        return (mirror, True) if mirror < key else (key, False)
+
+    def choices(self) -> List[int]:
+        '''List all columns that still have room for another piece.'''
+        return [i for i, h in enumerate(self.heights) if h < self.n_rows]
+
+    def push(self, col:int, player:int) -> int:
+        '''Drop a piece of `player` into column `col` and return its bit position.'''
+        pos = col * self.height + self.heights[col]
+        self.bits[player]   |= 1 << pos
+        self.mirror[player] |= 1 << ((self.n_cols - 1 - col) * self.height + self.heights[col])
+        self.heights[col] += 1
+        self.moves.append((col, player))
+        return pos
+
+    def pop(self) -> Tuple[int, int]:
+        '''Take back the last move and return it as `(col, player)`.'''
+        col, player = self.moves.pop()
+        self.heights[col] -= 1
+        self.bits[player]   &= ~(1 << (col * self.height + self.heights[col]))
+        self.mirror[player] &= ~(1 << ((self.n_cols - 1 - col) * self.height + self.heights[col]))
+        return col, player
+
+    def is_win(self, player:int, pos:int=-1) -> bool:
+        '''Check whether `player` has `target` adjacent pieces.
+
+            Arguments:
+                player (int): integer id of the player to check.
+                pos    (int): bit position of the last piece. Only the four lines through this
+                              cell are checked. A negative value checks the whole board.
+        '''
+        bits  = self.bits[player]
+        masks = line_index(self.n_rows, self.n_cols, self.target).run_starts[pos] if pos >= 0 else None
+
+        for i, shift in enumerate(self.shifts):
+            # bits set where a run of `target` pieces starts:
+            run = bits
+            for k in range(1, self.target):
+                run &= bits >> (k * shift)
+                if not run: break
+
+            if masks is None:
+                if run: return True
+            elif run & masks[i]: return True
+
+        return False
+
+    def winner(self) -> int:
+        '''Check whether the last move won the game. Returns the winning player or -1.'''
+        if not self.moves: return -1
+
+        col, player = self.moves[-1]
+        pos = col * self.height + self.heights[col] - 1
+        return player if self.is_win(player, pos) else -1
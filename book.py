@@ -0,0 +1,321 @@
+#====================================================================================================#
+# Imports:                                                                                           #
+#====================================================================================================#
+
+import os
+import mmap
+import struct
+import time
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from bitboard import Bitboard
+from lines import line_index
+
+
+#====================================================================================================#
+# File Format:                                                                                       #
+#====================================================================================================#
+
+# books are stored next to this module:
+BOOK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'books')
+
+# header: magic, version, n_rows, n_cols, n_target, log2 of the number of slots
+MAGIC   = b'TTTB'
+VERSION = 2
+HEADER  = struct.Struct('<4sBBBBB3x')
+
+# slot: canonical position key (0 marks an empty slot, see `Bitboard.canonical_key`), best move (of
+# the position the key belongs to), value for the player to move, flags
+SLOT    = struct.Struct('<QbbB')
+
+# flags of an entry:
+SOLVED  = 1   # the value is the exact game theoretic value, otherwise it is a search estimate
+
+def book_path(n_rows:int, n_cols:int, n_target:int, directory:str=BOOK_DIR) -> str:
+    '''File name of the book of a board size and target.'''
+    return os.path.join(directory, f'book_{n_rows:d}x{n_cols:d}_{n_target:d}.bin')
+
+def _slot(key:int, bits:int) -> int:
+    '''Fibonacci hashing of a position key onto a table of `2**bits` slots.'''
+    return ((key * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> (64 - bits) if bits > 0 else 0
+
+def write_book(path:str, n_rows:int, n_cols:int, n_target:int, entries:Dict[int, Tuple[int, int, int]]) -> None:
+    '''Write entries into an open addressing hash table file (at most half full).
+
+        Arguments:
+            path                                (str): output file.
+            n_rows, n_cols, n_target            (int): board size and target of the book.
+            entries (Dict[int, Tuple[int, int, int]]): `(move, value, flags)` by position key.
+    '''
+    bits = max(1, (2 * len(entries) - 1).bit_length())
+    mask = (1 << bits) - 1
+    data = bytearray(HEADER.size + SLOT.size * (1 << bits))
+    HEADER.pack_into(data, 0, MAGIC, VERSION, n_rows, n_cols, n_target, bits)
+
+    for key, (move, value, flags) in entries.items():
+        i = _slot(key, bits)
+        while SLOT.unpack_from(data, HEADER.size + i * SLOT.size)[0] != 0:
+            i = (i + 1) & mask
+        SLOT.pack_into(data, HEADER.size + i * SLOT.size, key, move, value, flags)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+#====================================================================================================#
+# Book Access:                                                                                       #
+#====================================================================================================#
+
+class Book:
+    def __init__(self, path:str) -> None:
+        '''Memory mapped, read-only view of a book file.
+
+            Arguments:
+                path (str): the book file.
+        '''
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.n_rows, self.n_cols, self.target, self.bits = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a book file of version {VERSION:d}')
+        self.mask = (1 << self.bits) - 1
+
+    def probe(self, key:int) -> Tuple[int, int, int]:
+        '''Look up a position key. Returns `(move, value, flags)` or None.'''
+        i = _slot(key, self.bits)
+        while True:
+            stored, move, value, flags = SLOT.unpack_from(self.data, HEADER.size + i * SLOT.size)
+            if stored == key: return move, value, flags
+            if stored == 0:   return None
+            i = (i + 1) & self.mask
+
+    def lookup(self, board:List[List[int]], player:int) -> Tuple[int, int, int]:
+        '''Look up the position of a list of columns with `player` to move (or its mirror image,
+           whose move is mirrored back).'''
+        key, flipped = Bitboard.from_columns(board, self.n_rows, self.target).canonical_key(player)
+        entry = self.probe(key)
+        if entry is not None and flipped: entry = (self.n_cols - 1 - entry[0],) + entry[1:]
+        return entry
+
+@lru_cache(maxsize=8)
+def open_book(n_rows:int, n_cols:int, n_target:int, directory:str=BOOK_DIR) -> Book:
+    '''Open (once per process) the book of a board size and target. Returns None if there is none
+       (or only one of an older version, which has to be generated again).'''
+    path = book_path(n_rows, n_cols, n_target, directory)
+    if not os.path.exists(path): return None
+    try: return Book(path)
+    except ValueError: return None
+
+
+#====================================================================================================#
+# Offline Solver:                                                                                    #
+#====================================================================================================#
+
+class BudgetExceeded(Exception):
+    '''Raised when the solver used up its node budget.'''
+
+class Solver:
+    def __init__(self, n_rows:int, n_cols:int, n_target:int) -> None:
+        '''Negamax solver with alpha-beta pruning on a bitboard.
+
+            A win is scored as one plus the number of cells still empty after the winning move (so
+            faster wins score higher), a full board without winner scores 0.
+
+            Arguments:
+                n_rows    (int): number of rows of the board
+                n_cols    (int): number of columns of the board
+                n_target  (int): number of adjacent pieces needed to win
+        '''
+        self.state  = Bitboard(n_rows, n_cols, n_target)
+        self.index  = line_index(n_rows, n_cols, n_target)
+        self.order  = sorted(range(n_cols), key=lambda c: abs(c - (n_cols - 1) / 2))
+        self.table  = {}
+        self.nodes  = 0
+        self.budget = 0
+
+    def negamax(self, player:int, alpha:int, beta:int, root:bool=False) -> Tuple[int, int]:
+        '''Exact value and best move for `player` to move (within the alpha-beta window). The move
+           returned by a table cutoff may not be the best one, so the root does not probe the table.'''
+        self.nodes += 1
+        if self.nodes > self.budget: raise BudgetExceeded()
+
+        # mirrored positions share an entry (see `Bitboard.canonical_key`):
+        state = self.state
+        key, flipped = state.canonical_key(player)
+        entry = self.table.get(key)
+        if entry is not None and not root:
+            lower, upper, move = entry
+            if flipped and move >= 0: move = state.n_cols - 1 - move
+            if lower >= beta:      return lower, move
+            if upper <= alpha:     return upper, move
+            if lower == upper:     return lower, move
+            alpha, beta = max(alpha, lower), min(beta, upper)
+
+        moves = [c for c in self.order if state.heights[c] < state.n_rows]
+        if not moves: return 0, -1
+
+        empty = state.n_rows * state.n_cols - len(state.moves)
+        alpha_orig, best, best_move = alpha, -empty - 1, moves[0]
+        for col in moves:
+            pos = state.push(col, player)
+            if state.is_win(player, pos): value = empty
+            else:                         value = -self.negamax(1 - player, -beta, -alpha)[0]
+            state.pop()
+
+            if value > best: best, best_move = value, col
+            alpha = max(alpha, value)
+            if alpha >= beta: break
+
+        # store bounds of the value. The best move of a node that failed low is just the move with
+        # the highest upper bound, so the move of the entry is only replaced by the move of an
+        # exact value or a cutoff (which reaches the lower bound):
+        lower, upper, move = entry if entry is not None else (-empty - 1, empty + 1, -1)
+        if best <= alpha_orig: upper = min(upper, best)
+        elif best >= beta:     lower, move = max(lower, best), state.n_cols - 1 - best_move if flipped else best_move
+        else:                  lower, upper, move = best, best, state.n_cols - 1 - best_move if flipped else best_move
+        self.table[key] = (lower, upper, move)
+        return best, best_move
+
+    def solve(self, board:List[List[int]], player:int, budget:int) -> Tuple[int, int]:
+        '''Solve a position with `player` to move. Returns `(move, value)` or None if the node
+           budget is exceeded.'''
+        for col in range(len(board)):
+            for piece in board[col]: self.state.push(col, piece)
+
+        self.nodes, self.budget = 0, budget
+        try:
+            value, move = self.negamax(player, -self.state.n_rows * self.state.n_cols - 1, self.state.n_rows * self.state.n_cols + 1, root=True)
+            return move, value
+
+        except BudgetExceeded: return None
+
+        finally:
+            while self.state.moves: self.state.pop()
+
+    def estimate(self, board:List[List[int]], player:int, depth:int) -> Tuple[int, int]:
+        '''Best move of a depth limited search, scoring leaves by the open lines of both players.
+           Returns `(move, 0)`.'''
+        state = self.state
+        for col in range(len(board)):
+            for piece in board[col]: state.push(col, piece)
+
+        def evaluate(player):
+            score = 0
+            for mask in self.index.masks:
+                own, other = (state.bits[player] & mask).bit_count(), (state.bits[1 - player] & mask).bit_count()
+                if   other == 0: score += own * own
+                elif own == 0:   score -= other * other
+            return score
+
+        def search(player, depth, alpha, beta):
+            moves = [c for c in self.order if state.heights[c] < state.n_rows]
+            if not moves or depth == 0: return evaluate(player)
+            for col in moves:
+                pos = state.push(col, player)
+                if state.is_win(player, pos): value = 10**6
+                else:                         value = -search(1 - player, depth - 1, -beta, -alpha)
+                state.pop()
+                alpha = max(alpha, value)
+                if alpha >= beta: break
+            return alpha
+
+        try:
+            best, best_move = -10**7, -1
+            for col in [c for c in self.order if state.heights[c] < state.n_rows]:
+                pos = state.push(col, player)
+                value = 10**6 if state.is_win(player, pos) else -search(1 - player, depth - 1, -10**7, -best)
+                state.pop()
+                if value > best: best, best_move = value, col
+            return best_move, 0
+
+        finally:
+            while state.moves: state.pop()
+
+
+#====================================================================================================#
+# Book Generation:                                                                                   #
+#====================================================================================================#
+
+def generate(n_rows:int, n_cols:int, n_target:int, plies:int=8, budget:int=200000, depth:int=4, max_entries:int=250000) -> Dict[int, Tuple[int, int, int]]:
+    '''Build the entries of a book for all positions up to `plies` pieces.
+
+        Every opening position is solved if possible within `budget` nodes, otherwise its best move is
+        estimated by a search of `depth` plies. All positions solved along the way are added as well
+        (up to `max_entries`), which covers many endgames of small boards.
+
+        Returns (Dict[int, Tuple[int, int, int]]): `(move, value, flags)` by canonical position key
+                                                   (mirrored positions are solved once).
+    '''
+    if n_cols * (n_rows + 1) > 64:
+        raise ValueError('position keys of boards larger than 64 bits are not supported')
+
+    solver  = Solver(n_rows, n_cols, n_target)
+    entries = {}
+
+    # all positions up to `plies` pieces, player 0 starting (keys do not depend on colors), one of
+    # every pair of mirrored positions:
+    level = {Bitboard(n_rows, n_cols, n_target).key(0): [[] for _ in range(n_cols)]}
+    for ply in range(plies + 1):
+        player = ply % 2
+        following = {}
+
+        for key, board in level.items():
+            result = solver.solve(board, player, budget)
+            if result is not None: move, value, flags = result[0], result[1], SOLVED
+            else:                  move, value, flags = solver.estimate(board, player, depth) + (0,)
+
+            # store the move of the position the canonical key belongs to:
+            state = Bitboard.from_columns(board, n_rows, n_target)
+            if state.canonical_key(player)[1] and move >= 0: move = n_cols - 1 - move
+            entries[key] = (move, value, flags)
+
+            # expand to the next level (stopping at won positions):
+            for col in state.choices():
+                pos = state.push(col, player)
+                if not state.is_win(player, pos):
+                    child = [list(c) for c in board]
+                    child[col].append(player)
+                    following.setdefault(state.canonical_key(1 - player)[0], child)
+                state.pop()
+
+        level = following
+
+    # add exactly solved positions of the solver table:
+    for key, (lower, upper, move) in solver.table.items():
+        if len(entries) >= max_entries: break
+        if lower == upper and move >= 0 and key not in entries:
+            entries[key] = (move, lower, SOLVED)
+
+    return entries
+
+
+#====================================================================================================#
+# Main Function:                                                                                     #
+#====================================================================================================#
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate opening books / solved position tables.')
+    parser.add_argument('--sizes',   type=int, nargs='+', default=[3, 4, 5, 6], help='board sizes n (n x n boards)')
+    parser.add_argument('--targets', type=int, nargs='+', default=[3, 4],       help='targets (only those <= n are used)')
+    parser.add_argument('--plies',   type=int, default=8,      help='opening depth in pieces')
+    parser.add_argument('--budget',  type=int, default=200000, help='solver node budget per position')
+    parser.add_argument('--depth',   type=int, default=4,      help='search depth for unsolved positions')
+    parser.add_argument('--out',     default=BOOK_DIR,         help='output directory')
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        for target in args.targets:
+            if target > size: continue
+
+            t = time.perf_counter()
+            entries = generate(size, size, target, args.plies, args.budget, args.depth)
+            path = book_path(size, size, target, args.out)
+            write_book(path, size, size, target, entries)
+
+            solved = sum(1 for _, _, flags in entries.values() if flags & SOLVED)
+            print(f'{path}: {len(entries):d} positions ({solved:d} solved) in {time.perf_counter() - t:.1f} s')
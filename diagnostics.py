@@ -0,0 +1,156 @@
+#====================================================================================================#
+# Imports:                                                                                           #
+#====================================================================================================#
+
+import os
+import time
+import atexit
+import threading
+from collections import deque
+from typing import Any
+
+
+#====================================================================================================#
+# Channels:                                                                                          #
+#====================================================================================================#
+
+# levels of records:
+DEBUG   = 10
+INFO    = 20
+WARNING = 30
+OFF     = 100
+LEVELS  = {'debug': DEBUG, 'info': INFO, 'warning': WARNING, 'off': OFF}
+
+# lowest level that is recorded (nothing until `enable` is called) and the records not written yet
+# as (time, channel, level, message, arguments):
+_level  = OFF
+_buffer = deque()
+
+class Channel:
+    '''Diagnostics channel of a bot or module (see `channel`).'''
+    __slots__ = ('name',)
+
+    def __init__(self, name:str) -> None:
+        self.name = name
+
+    def enabled(self, level:int) -> bool:
+        '''Whether records of a level are kept (to skip computing expensive arguments).'''
+        return level >= _level
+
+    def log(self, level:int, message:str, *args:Any) -> None:
+        '''Record a message with %-style arguments, formatted later by the writer thread.'''
+        if level >= _level:
+            _buffer.append((time.time(), self.name, level, message, args))
+            if _writer is not None and len(_buffer) >= _writer.batch: _writer.wake.set()
+
+    def debug(self, message:str, *args:Any) -> None:
+        if _level <= DEBUG: self.log(DEBUG, message, *args)
+
+    def info(self, message:str, *args:Any) -> None:
+        if _level <= INFO: self.log(INFO, message, *args)
+
+    def warning(self, message:str, *args:Any) -> None:
+        if _level <= WARNING: self.log(WARNING, message, *args)
+
+def channel(name:str) -> Channel:
+    '''The diagnostics channel of a bot or module. While diagnostics are disabled, a call costs one
+       level check. Otherwise a record is appended to an in-memory buffer, which a background thread
+       formats and writes, so recording adds next to nothing to the measured move time.'''
+    return Channel(name)
+
+
+#====================================================================================================#
+# Output:                                                                                            #
+#====================================================================================================#
+
+class _Writer(threading.Thread):
+    def __init__(self, path:str, max_bytes:int, backups:int, interval:float, batch:int) -> None:
+        '''Background thread writing the buffered records to a size capped, rotating file.'''
+        super().__init__(name='diagnostics', daemon=True)
+        self.path      = path
+        self.max_bytes = max_bytes
+        self.backups   = backups
+        self.interval  = interval
+        self.batch     = batch
+        self.wake      = threading.Event()
+        self.stopped   = False
+        self.lock      = threading.Lock()
+        self.file      = open(path, 'a')
+        self.size      = self.file.tell()
+
+    def run(self) -> None:
+        while not self.stopped:
+            self.wake.wait(self.interval)
+            self.wake.clear()
+            self.write()
+
+    def write(self) -> None:
+        '''Format and write all buffered records.'''
+        with self.lock:
+            if not _buffer: return
+            while _buffer:
+                t, name, level, message, args = _buffer.popleft()
+                stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(t))
+                line = f'{stamp} {os.getpid():d} {name} {_NAMES[level]} {message % args if args else message}\n'
+
+                if self.size > 0 and self.size + len(line) > self.max_bytes: self.rotate()
+                self.file.write(line)
+                self.size += len(line)
+            self.file.flush()
+
+    def rotate(self) -> None:
+        '''Move `path` to `path.1`, `path.1` to `path.2` ... and drop the oldest file.'''
+        self.file.close()
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f'{self.path}.{i:d}'): os.replace(f'{self.path}.{i:d}', f'{self.path}.{i + 1:d}')
+        if self.backups > 0: os.replace(self.path, f'{self.path}.1')
+        else:                os.remove(self.path)
+        self.file = open(self.path, 'a')
+        self.size = 0
+
+    def stop(self) -> None:
+        '''Write all remaining records and end the thread.'''
+        self.stopped = True
+        self.wake.set()
+        self.join()
+        self.write()
+        self.file.close()
+
+_NAMES  = {level: name.upper() for name, level in LEVELS.items()}
+_writer = None
+
+def enable(path:str='diagnostics.log', level:int=INFO, max_bytes:int=1 << 20, backups:int=3, interval:float=1.) -> None:
+    '''Start recording all channels from `level` on and writing them to a rotating file.
+
+        Arguments:
+            path        (str): the log file (rotated to `path.1` ... `path.<backups>`).
+            level       (int): lowest level recorded (`DEBUG`, `INFO` or `WARNING`).
+            max_bytes   (int): size at which the file is rotated.
+            backups     (int): number of rotated files kept.
+            interval  (float): seconds between writes (earlier when many records are buffered).
+    '''
+    global _level, _writer
+    disable()
+
+    _writer = _Writer(path, max_bytes, backups, interval, batch=1024)
+    _writer.start()
+    _level = level
+
+def disable() -> None:
+    '''Stop recording, writing all buffered records first.'''
+    global _level, _writer
+    _level = OFF
+    if _writer is not None: _writer.stop()
+    _writer = None
+    _buffer.clear()
+
+def flush() -> None:
+    '''Write all buffered records now (e.g. at the end of a game).'''
+    if _writer is not None: _writer.write()
+
+def parse_level(name:str) -> int:
+    '''Level of a name like "debug" or "info".'''
+    if name.lower() not in LEVELS: raise ValueError(f'unknown level: {name}')
+    return LEVELS[name.lower()]
+
+atexit.register(disable)
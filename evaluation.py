@@ -0,0 +1,85 @@
+#====================================================================================================#
+# Imports:                                                                                           #
+#====================================================================================================#
+
+from typing import List
+
+from lines import DIRECTIONS
+
+# NumPy is optional, players fall back to their pure python evaluation without it:
+try:
+    import numpy as np
+    HAVE_NUMPY = True
+
+except ImportError:
+    np = None
+    HAVE_NUMPY = False
+
+
+#====================================================================================================#
+# Grid Conversion:                                                                                   #
+#====================================================================================================#
+
+def to_grid(board:List[List[int]], height:int=0) -> 'np.ndarray':
+    '''Convert a list of columns into a dense int8 grid of shape (n_cols, height). Empty cells are -1.
+
+        Arguments:
+            board (List[List[int]]): the game plan as a list of columns.
+            height           (int): minimal number of rows of the grid (at least the highest column).
+    '''
+    height = max(height, max(len(col) for col in board), 1)
+    grid = np.full((len(board), height), -1, dtype=np.int8)
+    for c, col in enumerate(board):
+        if col: grid[c, :len(col)] = col
+    return grid
+
+
+#====================================================================================================#
+# Window Counting:                                                                                   #
+#====================================================================================================#
+
+def count_windows(owned:'np.ndarray', n_target:int) -> 'np.ndarray':
+    '''Count all windows of `n_target` adjacent cells (any direction) that are completely owned.
+
+        Arguments:
+            owned (np.ndarray): boolean array of shape (..., n_cols, n_rows).
+            n_target     (int): length of the windows.
+
+        Returns (np.ndarray): window counts with the leading batch shape of `owned`.
+    '''
+    n_cols, n_rows = owned.shape[-2:]
+    total = np.zeros(owned.shape[:-2], dtype=np.int64)
+
+    for dc, dr in DIRECTIONS:
+        # number and first row of window starts in this direction:
+        len_c = n_cols - (n_target - 1) * dc
+        len_r = n_rows - (n_target - 1) * abs(dr)
+        row0  = (n_target - 1) if dr < 0 else 0
+        if len_c <= 0 or len_r <= 0: continue
+
+        # and all shifted views of the window starts:
+        acc = owned[..., :len_c, row0:row0 + len_r]
+        for k in range(1, n_target):
+            c, r = k * dc, row0 + k * dr
+            acc = acc & owned[..., c:c + len_c, r:r + len_r]
+
+        total += acc.sum(axis=(-2, -1))
+
+    return total
+
+def _move_grids(board:List[List[int]], cols:List[int], player:int) -> 'np.ndarray':
+    '''Stack one grid per candidate column, each with a piece of `player` added to that column.'''
+    heights = [len(board[c]) for c in cols]
+    grid  = to_grid(board, max(heights) + 1)
+    grids = np.repeat(grid[None], len(cols), axis=0)
+    grids[np.arange(len(cols)), cols, heights] = player
+    return grids
+
+def score_moves(board:List[List[int]], cols:List[int], player:int, n_target:int) -> List[int]:
+    '''Number of owned windows of `player` after playing each of the given columns (one batched call).'''
+    if not cols: return []
+    return count_windows(_move_grids(board, cols, player) == player, n_target).tolist()
+
+def winning_moves(board:List[List[int]], cols:List[int], player:int, n_target:int) -> List[bool]:
+    '''Whether playing each of the given columns gives `player` a complete window (one batched call).'''
+    return [score > 0 for score in score_moves(board, cols, player, n_target)]
@@ -0,0 +1,122 @@
+#====================================================================================================#
+# Imports:                                                                                           #
+#====================================================================================================#
+
+import io
+import json
+import cProfile
+import pstats
+from typing import Any, Dict, Iterable, TextIO, Union
+
+
+#====================================================================================================#
+# Events:                                                                                            #
+#====================================================================================================#
+
+# events emitted by `TicTacToe.start`, in the order of a turn. Every hook is called as
+# `hook(event, data)`, `data['t']` is the time in seconds since the game started (monotonic clock):
+GAME_START   = 'game_start'    # n_rows, n_cols, n_target, timeout, first (player of the first turn)
+TURN_START   = 'turn_start'    # turn, player, choices (number of free columns)
+TURN_END     = 'turn_end'      # turn, player, move, think (seconds in the player), error
+MOVE_APPLIED = 'move_applied'  # turn, player, move, apply and render (seconds)
+WIN_CHECK    = 'win_check'     # turn, winner, check (seconds)
+GAME_END     = 'game_end'      # winner, reason, turns, duration and the total seconds per phase
+
+EVENTS = (GAME_START, TURN_START, TURN_END, MOVE_APPLIED, WIN_CHECK, GAME_END)
+
+# phases of a turn that are timed separately (and can be profiled):
+PHASES = ('think', 'apply', 'render', 'check')
+
+
+#====================================================================================================#
+# Event Sinks:                                                                                       #
+#====================================================================================================#
+
+class JSONLinesSink:
+    def __init__(self, target:Union[str, TextIO], **context:Any) -> None:
+        '''Hook writing every event as one JSON object per line.
+
+            The lines of a game are buffered and written with a single call at its end, so several
+            processes can append to the same file without interleaving their games.
+
+            Arguments:
+                target (str or file): path of the output file (opened for appending) or an open file.
+                context       (dict): extra fields added to every event (e.g. the seed of a round).
+        '''
+        self.file    = open(target, 'a') if isinstance(target, str) else target
+        self.owned   = isinstance(target, str)
+        self.context = context
+        self.buffer  = io.StringIO()
+
+    def __call__(self, event:str, data:Dict[str, Any]) -> None:
+        self.buffer.write(json.dumps({'event': event, **self.context, **data}))
+        self.buffer.write('\n')
+        if event == GAME_END: self.flush()
+
+    def flush(self) -> None:
+        '''Write all buffered events.'''
+        self.file.write(self.buffer.getvalue())
+        self.file.flush()
+        self.buffer = io.StringIO()
+
+    def close(self) -> None:
+        '''Write all buffered events and close the file if it was opened by the sink.'''
+        self.flush()
+        if self.owned: self.file.close()
+
+class PhaseTimer:
+    def __init__(self) -> None:
+        '''Hook summing up the time spent in every phase over any number of games.'''
+        self.totals = dict.fromkeys(PHASES, 0.)
+        self.games  = 0
+        self.turns  = 0
+
+    def __call__(self, event:str, data:Dict[str, Any]) -> None:
+        if event == GAME_END:
+            for phase in PHASES: self.totals[phase] += data[phase]
+            self.games += 1
+            self.turns += data['turns']
+
+    def report(self) -> str:
+        '''Share and average time per turn of every phase.'''
+        total = sum(self.totals.values()) or 1.
+        return '\n'.join(
+            f'  {phase:>6s}: {t*100./total:5.1f} % ({t/max(self.turns, 1)*1000.:.3f} ms per turn)'
+            for phase, t in self.totals.items()
+        )
+
+
+#====================================================================================================#
+# Profiling:                                                                                         #
+#====================================================================================================#
+
+class PhaseProfiler:
+    def __init__(self, phases:Iterable[str]=('think',)) -> None:
+        '''One `cProfile.Profile` per phase of a turn. The game enables a profile only while the
+           corresponding phase runs, so player code and game overhead can be profiled separately.
+
+            Arguments:
+                phases (Iterable[str]): phases to profile (see `PHASES`).
+        '''
+        unknown = set(phases) - set(PHASES)
+        if unknown: raise ValueError(f'unknown phases: {", ".join(sorted(unknown))}')
+        self.profiles = {phase: cProfile.Profile() for phase in phases}
+
+    def get(self, phase:str) -> cProfile.Profile:
+        '''The profile of a phase or None if it is not profiled.'''
+        return self.profiles.get(phase)
+
+    def stats(self, phase:str) -> pstats.Stats:
+        '''Collected statistics of a phase.'''
+        return pstats.Stats(self.profiles[phase])
+
+    def dump(self, prefix:str) -> None:
+        '''Write the statistics of every phase to `<prefix>.<phase>.prof` (readable by pstats).'''
+        for phase, profile in self.profiles.items():
+            profile.dump_stats(f'{prefix}.{phase}.prof')
+
+    def print(self, sort:str='cumulative', limit:int=20) -> None:
+        '''Print the top functions of every profiled phase.'''
+        for phase in self.profiles:
+            print(f'\nProfile of phase "{phase}":')
+            self.stats(phase).sort_stats(sort).print_stats(limit)
@@ -4,15 +4,70 @@
 
 import random
 import time
-import copy
+from collections.abc import Mapping
+
+from bitboard import Bitboard
+from events import GAME_START, TURN_START, TURN_END, MOVE_APPLIED, WIN_CHECK, GAME_END, PHASES
 
 
 #====================================================================================================#
 # Typing:                                                                                            #
 #====================================================================================================#
 
-from typing import Any, List, Dict, Tuple, Callable
-player_callable = Callable[[List[List[int]], List[int], int, Any], Tuple[int, Any]]
+from typing import Any, List, Dict, Iterable, Iterator, NamedTuple, Protocol, Tuple, Callable
+
+class player_callable(Protocol):
+    '''`play(board, choices, player, memory, context=None) -> (column, memory)`. Players that do not
+       take the keyword argument `context` are called without it (see `accepts_context`).'''
+    def __call__(self, board:List[List[int]], choices:List[int], player:int, memory:Any, context:'GameContext'=None) -> Tuple[int, Any]: ...
+
+hook_callable = Callable[[str, Dict[str, Any]], None]
+
+
+#====================================================================================================#
+# Board View:                                                                                        #
+#====================================================================================================#
+
+class BoardView(tuple):
+    '''Read-only snapshot of the board handed to the players: a tuple of columns, each column a tuple
+       of player ids. The game keeps one up to date, so handing it out costs nothing and players
+       cannot change the board of the game.'''
+    __slots__ = ()
+
+    def copy(self) -> List[List[int]]:
+        '''Create a mutable copy of the board as a list of columns.'''
+        return [list(col) for col in self]
+
+
+#====================================================================================================#
+# Game Context:                                                                                      #
+#====================================================================================================#
+
+class GameContext(NamedTuple):
+    '''Configuration of the game and time limit of the current move. It is passed to players whose
+       `play` function takes a keyword argument `context` (see `accepts_context`), all other players
+       are called with the four arguments of `player_callable` only.'''
+    n_rows:   int
+    n_cols:   int
+    n_target: int
+    timeout:  float  # seconds per move (0 for no limit)
+    deadline: float  # `time.perf_counter()` by which the move has to be made (inf for no limit)
+    turn:     int    # number of the move in the game, starting at 1
+
+    def remaining(self) -> float:
+        '''Seconds left for the current move (inf for no limit).'''
+        return self.deadline - time.perf_counter()
+
+def accepts_keyword(play:player_callable, name:str) -> bool:
+    '''Whether a player takes the keyword argument `name` (or takes `**kwargs`).'''
+    import inspect
+    try: parameters = inspect.signature(play).parameters.values()
+    except (TypeError, ValueError): return False
+    return any(p.kind == p.VAR_KEYWORD or p.name == name and p.kind != p.POSITIONAL_ONLY for p in parameters)
+
+def accepts_context(play:player_callable) -> bool:
+    '''Whether a player takes the game context as keyword argument `context` (or takes `**kwargs`).'''
+    return accepts_keyword(play, 'context')
 
 
 #====================================================================================================#
@@ -20,7 +75,7 @@ player_callable = Callable[[List[List[int]], List[int], int, Any], Tuple[int, An
 #====================================================================================================#
 
 class TicTacToe:
-    def __init__(self, n_rows:int=5, n_cols:int=5, n_target:int=5, timeout:float=0) -> None:
+    def __init__(self, n_rows:int=5, n_cols:int=5, n_target:int=5, timeout:float=0, silent:bool=False, hooks:List[hook_callable]=None, profiler:Any=None) -> None:
         '''Create a new TicTacToe game for two players.
 
             Arguments:
@@ -28,11 +83,19 @@ class TicTacToe:
                 n_cols    (int): number of columns of the board
                 n_target  (int): number of adjacent pieces needed to win
                 timeout (float): time for each turn in seconds
+                silent   (bool): if True, nothing is printed or rendered during the game
+                hooks    (list): callbacks `hook(event, data)` receiving the events of `events.py`
+                profiler  (Any): an `events.PhaseProfiler` profiling some phases of every turn
         '''
         self.columns     = [[] for _ in range(n_cols)]
+        self.view        = BoardView(() for _ in range(n_cols))
+        self.state       = Bitboard(n_rows, n_cols, n_target)
         self.max_rows    = n_rows
         self.target      = n_target
         self.timeout     = timeout
+        self.silent      = silent
+        self.hooks       = list(hooks) if hooks else []
+        self.profiler    = profiler
 
     def __repr__(self) -> str:
         '''Create some ascii-art representing the current state of the game.'''
@@ -61,201 +124,436 @@ class TicTacToe:
             Arguments:
                 player1 (player_callable): a callback performing the actions of player 1.
                 player2 (player_callable): a callback performing the actions of player 2.
+
+            Players taking a keyword argument `context` get the `GameContext` of every move.
         '''
 
         # game variables:
         callbacks = (player1, player2)
+        contexts = [accepts_context(callback) for callback in callbacks]
         memory = [None, None]
         times  = [[], []]
+        phases = dict.fromkeys(PHASES, 0.)
         player = random.randint(0,1)
         winner = -1
+        reason = 'line'
+        turn   = 0
+        self.t_start = time.perf_counter()
+        self.emit(GAME_START, n_rows=self.max_rows, n_cols=len(self.columns), n_target=self.target, timeout=self.timeout, first=1 - player)
 
         # print gameplan:
-        print(self)
+        self.log(self)
 
         while winner < 0:
             # get all possible columns:
-            choices = [i for i, col in enumerate(self.columns) if len(col) < self.max_rows]
+            choices = self.state.choices()
             if len(choices) == 0:
-                print(f'\nGame Over. Fastest player wins!')
+                self.log(f'\nGame Over. Fastest player wins!')
                 t0, t1 = [sum(t)/len(t) for t in times]
                 winner = int(t1 < t0)
+                reason = 'full'
                 break
 
             # get next player:
             player = (player + 1) % 2
-            print(f"\nPlayer {player + 1:d}'s turn ({('o','x')[player]}):")
+            turn  += 1
+            self.log(f"\nPlayer {player + 1:d}'s turn ({('o','x')[player]}):")
+            self.emit(TURN_START, turn=turn, player=player, choices=len(choices))
 
             # get next column from player (with timeout):
-            t = time.time()
-
-            try: move, memory[player] = callbacks[player](copy.deepcopy(self.columns), copy.deepcopy(choices), player, memory[player])
+            context = {'context': self.context()} if contexts[player] else {}
+            try: (move, memory[player]), t = self._timed('think', callbacks[player], self.view, tuple(choices), player, memory[player], **context)
+            except TimeoutError as e:  # the move was aborted at a hard time limit (see sandbox.py)
+                self.emit(TURN_END, turn=turn, player=player, move=None, think=None, error=repr(e))
+                self.log(f'\nPlayer {player + 1:d}\'s move timed out ({e}).')
+                winner = (player + 1) % 2
+                reason = 'timeout'
+                break
             except Exception as e:
-                print(f'\nExeption in player {player + 1:d} code: {e}')
+                self.emit(TURN_END, turn=turn, player=player, move=None, think=None, error=repr(e))
+                self.log(f'\nExeption in player {player + 1:d} code: {e}')
                 winner = (player + 1) % 2
+                reason = 'exception'
                 break
 
-            t = time.time() - t
             times[player].append(t)
+            phases['think'] += t
+            self.emit(TURN_END, turn=turn, player=player, move=move, think=t, error=None)
 
             if self.timeout > 0 and t > self.timeout:
-                print(f'\nPlayer {player + 1:d}\'s move timed out.')
+                self.log(f'\nPlayer {player + 1:d}\'s move timed out.')
                 winner = (player + 1) % 2
+                reason = 'timeout'
                 break
 
             if move not in choices:
-                print(f'\nImpossible move by player {player + 1:d}. Column {move + 1:d} is already full.')
+                self.log(f'\nImpossible move by player {player + 1:d}. Column {move + 1:d} is already full.')
                 winner = (player + 1) % 2
+                reason = 'illegal'
                 break
 
             # take turn:
-            self.columns[move].append(player)
-            print(self)
+            _, t_apply  = self._timed('apply', self.push, move, player)
+            _, t_render = self._timed('render', self.log, self)
+            phases['apply']  += t_apply
+            phases['render'] += t_render
+            self.emit(MOVE_APPLIED, turn=turn, player=player, move=move, apply=t_apply, render=t_render)
 
             # check for winner:
-            winner = self.check_win()
+            winner, t = self._timed('check', self.check_win)
+            phases['check'] += t
+            self.emit(WIN_CHECK, turn=turn, winner=winner, check=t)
 
         # return winning player:
-        print(f'\nPlayer {winner + 1:d} won the round!')
+        self.log(f'\nPlayer {winner + 1:d} won the round!')
         for i, t in enumerate(times):
-            if len(t) > 0: print(f'  Average time per turn player {i + 1:d}: {sum(t)/len(t)*1000.:.2f} ms')
+            if len(t) > 0: self.log(f'  Average time per turn player {i + 1:d}: {sum(t)/len(t)*1000.:.2f} ms')
+        self.emit(GAME_END, winner=winner, reason=reason, turns=turn, duration=time.perf_counter() - self.t_start, **phases)
 
         return (winner,) + tuple(times)
 
-    def check_win(self) -> int:
-        '''Check whether any of the players has `target` adjacent pieces on the board (any direction).'''
-
-        # helper function checking single cells:
-        def check_cell(i, j, last, count):
-            if j >= len(self.columns[i]):
-                last, count = -1, 0
-
-            elif self.columns[i][j] == last:
-                count += 1
-
-            else: last, count = self.columns[i][j], 1
-
-            return last, count, count >= self.target
-
-
-        # vertically:
-        for i in range(len(self.columns)):
-            last, count = -1, 0
-
-            for j in range(self.max_rows):
-                # check cell:
-                last, count, win = check_cell(i, j, last, count)
-
-                # exit on win:
-                if win: return last
-
-
-        # horizontally:
-        for j in range(self.max_rows):
-            last, count = -1, 0
-            
-            for i in range(len(self.columns)):
-                # check cell:
-                last, count, win = check_cell(i, j, last, count)
+    def context(self) -> GameContext:
+        '''The game context of the next move, its deadline counting from now.'''
+        deadline = time.perf_counter() + self.timeout if self.timeout > 0 else float('inf')
+        return GameContext(self.max_rows, len(self.columns), self.target, self.timeout, deadline, len(self.state.moves) + 1)
+
+    def emit(self, event:str, **data:Any) -> None:
+        '''Pass an event with its data (and the time since the start of the game) to all hooks.'''
+        if not self.hooks: return
+        data['t'] = time.perf_counter() - self.t_start
+        for hook in self.hooks: hook(event, data)
+
+    def _timed(self, phase:str, function:Callable, *args:Any, **kwargs:Any) -> Tuple[Any, float]:
+        '''Call `function(*args, **kwargs)` and return its result and duration in seconds (monotonic clock).
+           The call is profiled if the profiler covers `phase`.'''
+        profile = self.profiler.get(phase) if self.profiler is not None else None
+        t = time.perf_counter()
+        if profile is None: return function(*args, **kwargs), time.perf_counter() - t
+
+        profile.enable()
+        try:     result = function(*args, **kwargs)
+        finally: profile.disable()
+        return result, time.perf_counter() - t
+
+    def log(self, *args:Any) -> None:
+        '''Print to the console unless the game is silent.'''
+        if not self.silent: print(*args)
+
+    def push(self, col:int, player:int) -> None:
+        '''Place a piece of `player` in column `col`.'''
+        self.columns[col].append(player)
+        self.state.push(col, player)
+        self._update_view(col)
+
+    def pop(self) -> int:
+        '''Take back the last move and return its column.'''
+        col, _ = self.state.pop()
+        self.columns[col].pop()
+        self._update_view(col)
+        return col
+
+    def _update_view(self, col:int) -> None:
+        '''Replace column `col` in the read-only view of the board.'''
+        view = list(self.view)
+        view[col] = tuple(self.columns[col])
+        self.view = BoardView(view)
 
-                # exit on win:
-                if win: return last
+    def check_win(self) -> int:
+        '''Check whether the last move gave its player `target` adjacent pieces (any direction).'''
+        return self.state.winner()
 
 
-        # diagonally (up):
-        for i in range(len(self.columns)):
-            j, last, count = 0, -1, 0
+#====================================================================================================#
+# Dynamic Player Import:                                                                             #
+#====================================================================================================#
 
-            while i < len(self.columns) and j < self.max_rows:
-                # check cell:
-                last, count, win = check_cell(i, j, last, count)
+# entry point group of installed bot packages, e.g. `[project.entry-points."tictactoe.players"]`
+# with `mybot = "mybot.player:play"`:
+ENTRY_POINT_GROUP = 'tictactoe.players'
 
-                # exit on win:
-                if win: return last
+# loaded players (or the exception of a failed load) by source, with the modification time of the file:
+_loaded = {}
 
-                i += 1
-                j += 1
+def load_player(source:str) -> player_callable:
+    '''Load the `play` function of a player. Players are cached until their file changes, and so
+       are failures (a broken file is not executed again until it is modified).
 
-        for j in range(self.max_rows):
-            i, last, count = 0, -1, 0
+        Arguments:
+            source (str): a player script (`.../player_<name>.py`) or an entry point reference
+                          (`package.module:function`).
+    '''
+    import os
+    import importlib
+    import importlib.util
 
-            while i < len(self.columns) and j < self.max_rows:
-                # check cell:
-                last, count, win = check_cell(i, j, last, count)
+    stamp = os.stat(source).st_mtime_ns if source.endswith('.py') else None
+    cached = _loaded.get(source)
+    if cached is not None and cached[0] == stamp:
+        if isinstance(cached[1], Exception): raise cached[1]
+        return cached[1]
+
+    try:
+        if stamp is None:
+            module, _, attr = source.partition(':')
+            play = getattr(importlib.import_module(module), attr or 'play')
+
+        else:
+            # create spec:
+            name = os.path.splitext(os.path.basename(source))[0][len('player_'):]
+            player_spec = importlib.util.spec_from_file_location(name, source)
+
+            # load module:
+            player_module = importlib.util.module_from_spec(player_spec)
+            player_spec.loader.exec_module(player_module)
+            play = player_module.play
+
+    except Exception as e:
+        _loaded[source] = (stamp, e)
+        raise
+
+    _loaded[source] = (stamp, play)
+    return play
+
+def discover_players(paths:List[str]=None, group:str=ENTRY_POINT_GROUP) -> Dict[str, str]:
+    '''List all players without loading them.
+
+        Arguments:
+            paths (List[str]): directories searched for `player_<name>.py` scripts (default: the
+                               working directory and the directories in the `TICTACTOE_PLAYERS`
+                               environment variable).
+            group       (str): entry point group of installed players (None to skip them).
+
+        Returns (Dict[str, str]): the source of every player by name, earlier paths take precedence
+                                  over later ones and scripts over entry points.
+    '''
+    # imports inside the function in order to avoid overhead:
+    import os
+    import re
 
-                # exit on win:
-                if win: return last
+    if paths is None:
+        paths = ['.'] + [p for p in os.environ.get('TICTACTOE_PLAYERS', '').split(os.pathsep) if p]
 
-                i += 1
-                j += 1
+    # we are looking for any python script that starts with "player_"
+    player_expression = re.compile(r"player_(?P<name>\S+)\.py")
 
+    sources = {}
+    for path in paths:
+        if not os.path.isdir(path): continue
+        for file in sorted(os.listdir(path)):
+            # see if filename matches our pattern:
+            m = player_expression.fullmatch(file)
+            if m is not None and m['name'] not in sources:
+                sources[m['name']] = os.path.join(path, file) if path != '.' else file
 
-        # diagonally (down):
-        for i in range(len(self.columns)):
-            j, last, count = self.max_rows-1, -1, 0
+    if group is not None:
+        from importlib.metadata import entry_points
+        for entry in entry_points(group=group):
+            sources.setdefault(entry.name, entry.value)
 
-            while i < len(self.columns) and j >= 0:
-                # check cell:
-                last, count, win = check_cell(i, j, last, count)
+    return sources
 
-                # exit on win:
-                if win: return last
+class PlayerCatalog(Mapping):
+    def __init__(self, sources:Dict[str, str]) -> None:
+        '''Mapping of player names to their `play` functions. A player is only loaded when it is
+           accessed, listing names or checking membership executes nothing.
 
-                i += 1
-                j -= 1
+            Arguments:
+                sources (Dict[str, str]): player sources by name (see `discover_players`).
+        '''
+        self.sources = sources
 
-        for j in range(self.max_rows):
-            i, last, count = len(self.columns)-1, -1, 0
+    def __getitem__(self, name:str) -> player_callable:
+        return load_player(self.sources[name])
 
-            while i >= 0 and j < self.max_rows:
-                # check cell:
-                last, count, win = check_cell(i, j, last, count)
+    def __contains__(self, name:Any) -> bool:
+        return name in self.sources
 
-                # exit on win:
-                if win: return last
+    def __iter__(self):
+        return iter(self.sources)
 
-                i -= 1
-                j += 1
+    def __len__(self) -> int:
+        return len(self.sources)
 
-        return -1
+def import_players(paths:List[str]=None, group:str=ENTRY_POINT_GROUP) -> PlayerCatalog:
+    ''' Dynamically loads players (lazily, see `discover_players` for the arguments). '''
+    return PlayerCatalog(discover_players(paths, group))
 
 
 #====================================================================================================#
-# Dynamic Player Import:                                                                             #
+# Tournament:                                                                                        #
 #====================================================================================================#
 
-def import_players() -> Dict[str, player_callable]:
-    ''' Dynamically loads players. '''
-
-    # imports inside the function in order to avoid overhead:
-    import os
-    import re
-    import importlib.util
-
-    # we are looking for any python script that starts with "player_"
-    player_expression = re.compile(r"player_(?P<name>\S+)\.py")
-
-    # find and import players:
-    players = {}
-    for file in os.listdir('.'):
-        # see if filename matches our 
-        m = player_expression.match(file)
-
-        if m is not None:
-            try:
-                # create spec:
-                player_spec = importlib.util.spec_from_file_location(m['name'], file)
-                
-                # load module:
-                player_module = importlib.util.module_from_spec(player_spec)
-                player_spec.loader.exec_module(player_module)
-
-                # add player to output:
-                players[m['name']] = player_module.play
-
-            except Exception as e: print(f"Unable to load player \"{m['name']}\": {e}")
+# players of this process:
+_players = PlayerCatalog({})
+
+# player processes (see sandbox.py) by player slot, name and timeout, kept for the whole tournament:
+_sandboxes = {}
+
+def _init_worker(paths:List[str]=None, diagnostics:Tuple[str, int]=None, pooled:bool=False) -> None:
+    '''Finds all players inside a tournament worker process (they are loaded on first use) and
+       starts the diagnostics output of the process (one file per worker). The players of a pool
+       worker (`pooled`) stay serial, since the pool already keeps all cores busy (see
+       `parallel.available`).'''
+    global _players
+    _players = import_players(paths)
+
+    if pooled:
+        import parallel
+        parallel.stay_serial()
+
+    if diagnostics is not None:
+        import os
+        import diagnostics as channel
+        from multiprocessing.util import Finalize
+        channel.enable(f'{diagnostics[0]}.{os.getpid():d}', diagnostics[1])
+
+        # atexit does not run in pool workers, but the exit functions of multiprocessing do:
+        Finalize(None, channel.disable, exitpriority=10)
+
+def _lazy_map(function:Callable[[Any], Any], jobs:Iterable[Any], workers:int, paths:List[str]=None) -> Iterator[Any]:
+    '''Results of `function` for all jobs, in order, computed by a pool of worker processes (see
+       `_init_worker`, 1 computes them in this process). At most two jobs per worker are in flight,
+       so the jobs are drawn lazily and memory stays constant.'''
+    if workers <= 1:
+        if not _players: _init_worker(paths)
+        for job in jobs: yield function(job)
+        return
+
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(paths, None, True)) as pool:
+        pending = deque()
+        try:
+            for job in jobs:
+                pending.append(pool.submit(function, job))
+                if len(pending) >= 2 * workers: yield pending.popleft().result()
+            while pending: yield pending.popleft().result()
+
+        finally:
+            for future in pending: future.cancel()
+
+def _sandboxed(slot:int, name:str, timeout:float) -> player_callable:
+    '''The player process of a player slot, started on first use.'''
+    key = (slot, name, timeout)
+    if key not in _sandboxes:
+        from sandbox import PlayerProcess
+        _sandboxes[key] = PlayerProcess(_players.sources[name], timeout)
+    return _sandboxes[key]
+
+def play_round(job:Tuple[str, str, int, float, bool, str, str, bool], profiler:Any=None) -> Tuple[int, List[float], List[float]]:
+    '''Play a single round on a random board. The seed fixes board size, target, starting player
+       and the random state handed to the players, so the moves do not depend on the worker (only
+       rounds ending on a full board are decided by the measured times).
+
+        Arguments:
+            job (Tuple[str, str, int, float, bool, str, str, bool]): names of player 1 and 2, seed of
+                                                                     the round, timeout in seconds,
+                                                                     the silent flag, a JSON-lines
+                                                                     event file and a game record
+                                                                     file (or None each), and
+                                                                     whether the players run in
+                                                                     their own processes.
+            profiler                                          (Any): an `events.PhaseProfiler` for
+                                                                     the round.
+    '''
+    name1, name2, seed, timeout, silent, events, records, sandbox = job
+    random.seed(seed)
+
+    hooks = []
+    if events is not None:
+        from events import JSONLinesSink
+        hooks.append(JSONLinesSink(events, seed=seed, player1=name1, player2=name2))
+    if records is not None:
+        from records import GameRecorder
+        hooks.append(GameRecorder(records, seed=seed))
+
+    size = random.randint(3, 10)
+    game = TicTacToe(
+        n_cols=size,
+        n_rows=size,
+        n_target=random.randint(3, size),
+        timeout=timeout,
+        silent=silent,
+        hooks=hooks,
+        profiler=profiler
+    )
+    try:
+        return game.start(
+            player1=_sandboxed(0, name1, timeout) if sandbox else _players[name1],
+            player2=_sandboxed(1, name2, timeout) if sandbox else _players[name2]
+        )
 
-    return players
+    finally:
+        for hook in hooks: hook.close()
+
+        # write the diagnostics of the round (a worker may be stopped without running its exit functions):
+        import diagnostics
+        diagnostics.flush()
+
+def tournament(name1:str, name2:str, n_rounds:int, timeout:float=0, seed:int=None, workers:int=1, silent:bool=True, events:str=None, records:str=None, sandbox:bool=False, profiler:Any=None, paths:List[str]=None, diagnostics:Tuple[str, int]=None) -> Tuple[List[Tuple[int, List[float], List[float]]], Dict[str, Any]]:
+    '''Play `n_rounds` rounds between two players without any user interaction.
+
+        Arguments:
+            name1     (str): name of player 1 as returned by `import_players`
+            name2     (str): name of player 2 as returned by `import_players`
+            n_rounds  (int): number of rounds to play
+            timeout (float): time for each turn in seconds (0 for no timeout)
+            seed      (int): seed from which the seeds of all rounds are drawn (random if None)
+            workers   (int): number of worker processes (1 plays all rounds in this process)
+            silent   (bool): if True, games are neither printed nor rendered
+            events    (str): if given, all game events are appended to this JSON-lines file
+            records   (str): if given, a record of every round is appended to this file (`records.py`)
+            sandbox  (bool): if True, every player runs in its own process, which is killed when it
+                             exceeds the timeout (`sandbox.py`)
+            profiler  (Any): an `events.PhaseProfiler` (rounds are then played in this process)
+            paths    (list): directories searched for players (see `discover_players`)
+            diagnostics (Tuple[str, int]): log file and level of the diagnostics of the players
+                                           (`diagnostics.py`), each worker writes `<file>.<pid>`
+
+        Returns: a list of `(winner, times1, times2)` tuples, one per round, and the statistics
+                 computed by `summarize`.
+    '''
+    # draw one seed per round:
+    if seed is None: seed = random.randrange(2**32)
+    rng   = random.Random(seed)
+    jobs  = [(name1, name2, rng.getrandbits(32), timeout, silent, events, records, sandbox) for _ in range(n_rounds)]
+
+    # create the record file before any worker appends to it:
+    if records is not None:
+        from records import GameWriter
+        GameWriter(records).close()
+
+    if workers <= 1 or profiler is not None:
+        if not _players: _init_worker(paths)
+        if diagnostics is not None:
+            import diagnostics as channel
+            channel.enable(*diagnostics)
+        rounds = [play_round(job, profiler) for job in jobs]
+
+    else:
+        # (the workers of an executor are no daemons, so they can start player processes)
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(paths, diagnostics, True)) as pool:
+            rounds = list(pool.map(play_round, jobs, chunksize=max(1, n_rounds // (8 * workers))))
+
+    stats = summarize(rounds)
+    stats['seed'] = seed
+    return rounds, stats
+
+def summarize(rounds:List[Tuple[int, List[float], List[float]]]) -> Dict[str, Any]:
+    '''Compute win counts, win rates and average times per turn of both players.'''
+    n_rounds = max(len(rounds), 1)
+    wins     = [sum(1 for w, _, _ in rounds if w == i) for i in range(2)]
+    times    = [[t for r in rounds for t in r[i + 1]] for i in range(2)]
+
+    return {
+        'rounds':   len(rounds),
+        'wins':     wins,
+        'win_rate': [w / n_rounds for w in wins],
+        'avg_time': [sum(t) / len(t) if len(t) > 0 else 0. for t in times]
+    }
 
 
 #====================================================================================================#
@@ -263,58 +561,117 @@ def import_players() -> Dict[str, player_callable]:
 #====================================================================================================#
 
 if __name__ == "__main__":
-    # import and list available players:
-    players = import_players()
-    print('\nAvailable Players:')
-    for player in players:
-        print(f' -> {player}')
+    import argparse
+
+    # parse arguments (unless both players are given, anything missing is asked for interactively):
+    parser = argparse.ArgumentParser(description='Play TicTacToe rounds between two players.')
+    parser.add_argument('--player1', help='name of player 1 (o)')
+    parser.add_argument('--player2', help='name of player 2 (x)')
+    parser.add_argument('--rounds',  type=int,   help='number of rounds')
+    parser.add_argument('--timeout', type=float, help='move timeout in seconds (0 for no timeout)')
+    parser.add_argument('--seed',    type=int,   help='seed for reproducible rounds')
+    parser.add_argument('--workers', type=int,   default=1, help='number of worker processes')
+    parser.add_argument('--silent',  action='store_true', help='do not print or render the games')
+    parser.add_argument('--events',  help='append all game events to this JSON-lines file')
+    parser.add_argument('--records', help='append a replayable record of every round to this file')
+    parser.add_argument('--sandbox', action='store_true', help='run every player in its own process, killed on timeout')
+    parser.add_argument('--profile', nargs='+', metavar='PHASE', help='profile phases of every turn (think, apply, render, check); plays in one process')
+    parser.add_argument('--path',    nargs='+', help='directories to search for player scripts (default: . and $TICTACTOE_PLAYERS)')
+    parser.add_argument('--diagnostics', metavar='FILE', help='write the diagnostics of the players to this (rotating) file')
+    parser.add_argument('--diagnostics-level', default='info', help='lowest diagnostics level written (debug, info, warning)')
+    parser.add_argument('--profile-out', help='write the profiles to <PROFILE_OUT>.<phase>.prof instead of printing them')
+    args = parser.parse_args()
+    headless = args.player1 is not None and args.player2 is not None
+    if headless:
+        if args.timeout is None: args.timeout = 0.
+        if args.rounds  is None: args.rounds  = 1
+
+    # find and list available players (only the selected ones are loaded):
+    players = _players = import_players(args.path)
+    if not args.silent:
+        print('\nAvailable Players:')
+        for player in players:
+            print(f' -> {player}')
+
+    def loadable(name):
+        '''Whether a player exists and can be loaded (tells the user otherwise).'''
+        if name is None: return False
+        if name not in players:
+            print(f'Input \'{name}\' not allowed.')
+            return False
+        try: players[name]
+        except Exception as e:
+            print(f"Unable to load player \"{name}\": {e}")
+            return False
+        return True
 
     # select player 1:
-    player1 = None
-    while player1 is None:
-        try: player1 = players[input('\nSelect player 1 (o): ')]
-        except KeyError as e: print(f'Input {e} not allowed.')
+    player1 = args.player1
+    while not loadable(player1):
+        player1 = input('\nSelect player 1 (o): ')
 
     # select player 2:
-    player2 = None
-    while player2 is None:
-        try: player2 = players[input('\nSelect player 2 (x): ')]
-        except KeyError as e: print(f'Input {e} not allowed.')
+    player2 = args.player2
+    while not loadable(player2):
+        player2 = input('\nSelect player 2 (x): ')
 
     # enter timeout:
-    timeout = -1
+    timeout = -1 if args.timeout is None else args.timeout
     while timeout < 0:
         try: timeout = float(input('\nEnter the move timeout in seconds (0 for no timeout): '))
         except Exception as e: print(e)
 
     # enter number of rounds:
-    n_rounds = 0
+    n_rounds = 0 if args.rounds is None else args.rounds
     while n_rounds <= 0:
         try: n_rounds = int(input('\nEnter the number of rounds: '))
         except Exception as e: print(e)
 
-    # play for three rounds:
-    rounds = []
-    for i in range(n_rounds):
-        size = random.randint(3, 10)
-        game = TicTacToe(
-            n_cols=size,
-            n_rows=size,
-            n_target=random.randint(3, size),
-            timeout=timeout
-        )
-        result = game.start(
-            player1=player1,
-            player2=player2
-        )
-        rounds.append(result)
+    # attach a profiler:
+    profiler = None
+    if args.profile:
+        from events import PhaseProfiler
+        profiler = PhaseProfiler(args.profile)
+
+    # write the diagnostics of the players:
+    diagnostics = None
+    if args.diagnostics:
+        from diagnostics import parse_level
+        diagnostics = (args.diagnostics, parse_level(args.diagnostics_level))
+
+    # play all rounds:
+    rounds, stats = tournament(
+        name1=player1,
+        name2=player2,
+        n_rounds=n_rounds,
+        timeout=timeout,
+        seed=args.seed,
+        workers=args.workers,
+        silent=args.silent,
+        events=args.events,
+        records=args.records,
+        sandbox=args.sandbox,
+        profiler=profiler,
+        paths=args.path,
+        diagnostics=diagnostics
+    )
 
     # print game statistics:
     winner = int(sum([w for w, _, _ in rounds]) > (.5 * len(rounds)))
     print(f'\nPlayer {winner + 1:d} wins the game!\n\nSummary:')
-    for i, (winner, t1, t2) in enumerate(rounds):
-        print(f'  Game {i+1:d}:')
-        print(f'    Winner: player {winner + 1:d}')
-        print(f'    Time player 1: {sum(t1)/len(t1)*1000.:.2f} ms')
-        print(f'    Time player 2: {sum(t2)/len(t2)*1000.:.2f} ms')
-        print()
\ No newline at end of file
+    if not args.silent:
+        for i, (winner, t1, t2) in enumerate(rounds):
+            print(f'  Game {i+1:d}:')
+            print(f'    Winner: player {winner + 1:d}')
+            print(f'    Time player 1: {sum(t1)/len(t1)*1000.:.2f} ms')
+            print(f'    Time player 2: {sum(t2)/len(t2)*1000.:.2f} ms')
+            print()
+
+    print(f'  Rounds: {stats["rounds"]:d} (seed {stats["seed"]:d})')
+    for i in range(2):
+        print(f'  Player {i + 1:d}: win rate {stats["win_rate"][i]*100.:.1f} %, average time per turn {stats["avg_time"][i]*1000.:.2f} ms')
+
+    # print or write the profiles:
+    if profiler is not None:
+        if args.profile_out: profiler.dump(args.profile_out)
+        else:                profiler.print()
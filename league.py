@@ -0,0 +1,224 @@
+#====================================================================================================#
+# Imports:                                                                                           #
+#====================================================================================================#
+
+import os
+import json
+import math
+import random
+import hashlib
+from typing import Any, Dict, List, Tuple
+
+import game
+
+
+#====================================================================================================#
+# Result Cache:                                                                                      #
+#====================================================================================================#
+
+def player_hash(source:str) -> str:
+    '''Hash of the code of a player: the content of its script (or of the module of an entry point).
+       Modules the player imports are not covered.'''
+    path = source
+    if not source.endswith('.py'):
+        import importlib.util
+        try: path = importlib.util.find_spec(source.partition(':')[0]).origin
+        except (ImportError, AttributeError, ValueError): path = None
+        if path is None: return hashlib.sha256(source.encode()).hexdigest()[:16]
+
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+class ResultCache:
+    def __init__(self, path:str=None) -> None:
+        '''Winners of played rounds by the hashes of both players, the seed and the timeout, kept in
+           an append-only JSON-lines file. Rounds of unchanged players are not played again.
+
+            Arguments:
+                path (str): the cache file (results are only kept in memory if None).
+        '''
+        self.path    = path
+        self.results = {}
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try: r = json.loads(line)
+                    except ValueError: continue  # (a line cut off by an interrupted league)
+                    self.results[(r['player1'], r['player2'], r['seed'], r['timeout'])] = r['winner']
+
+    def get(self, key:Tuple[str, str, int, float]) -> int:
+        '''Winner slot (0 or 1) of a round or None.'''
+        return self.results.get(key)
+
+    def put(self, key:Tuple[str, str, int, float], winner:int) -> None:
+        self.results[key] = winner
+        if self.path is not None:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps({'player1': key[0], 'player2': key[1], 'seed': key[2], 'timeout': key[3], 'winner': winner}) + '\n')
+
+
+#====================================================================================================#
+# Ratings:                                                                                           #
+#====================================================================================================#
+
+def bradley_terry(wins:List[List[float]], prior:float=.5, iterations:int=10000, tolerance:float=1e-10) -> Tuple[List[float], List[float]]:
+    '''Fit Bradley-Terry strengths to a win matrix and express them as Elo ratings.
+
+        Arguments:
+            wins (List[List[float]]): `wins[i][j]` is the number of wins of player i against player j.
+            prior            (float): virtual wins added both ways to every pairing that was played,
+                                      so players winning (or losing) every game get finite ratings.
+            iterations         (int): maximum number of iterations of the MM algorithm.
+            tolerance        (float): stop when no strength changes by more than this (relative).
+
+        Returns (Tuple[List[float], List[float]]): the Elo ratings (mean 0) and the half widths of
+                their approximate 95 % confidence intervals (from the diagonal of the Fisher
+                information, inf for players without games).
+    '''
+    n = len(wins)
+    games = [[wins[i][j] + wins[j][i] + (2 * prior if wins[i][j] + wins[j][i] > 0 else 0.) for j in range(n)] for i in range(n)]
+    score = [sum(wins[i]) + prior * sum(1 for j in range(n) if games[i][j] > 0) for i in range(n)]
+
+    # minorization-maximization updates (Hunter 2004), normalized to a geometric mean of 1:
+    strength = [1.] * n
+    for _ in range(iterations):
+        new = []
+        for i in range(n):
+            expected = sum(games[i][j] / (strength[i] + strength[j]) for j in range(n) if games[i][j] > 0)
+            new.append(score[i] / expected if expected > 0 else 1.)
+        mean = math.exp(sum(math.log(p) for p in new) / n)
+        new = [p / mean for p in new]
+        converged = max(abs(a - b) / b for a, b in zip(new, strength)) < tolerance
+        strength = new
+        if converged: break
+
+    scale = 400. / math.log(10.)
+    elo, ci = [], []
+    for i in range(n):
+        info = sum(games[i][j] * strength[i] * strength[j] / (strength[i] + strength[j]) ** 2 for j in range(n) if games[i][j] > 0)
+        elo.append(scale * math.log(strength[i]))
+        ci.append(1.96 * scale / math.sqrt(info) if info > 0 else float('inf'))
+    return elo, ci
+
+
+#====================================================================================================#
+# League:                                                                                            #
+#====================================================================================================#
+
+def league(names:List[str]=None, max_rounds:int=100, min_rounds:int=4, precision:float=50., timeout:float=0, seed:int=None, workers:int=1, sandbox:bool=False, cache:str=None, paths:List[str]=None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    '''Play a round-robin league until the ratings of all players are precise enough.
+
+        Every round draws one seed and plays it twice for every pairing, once with each player as
+        player 1, so both face the same board and random state from both sides. Rounds are played
+        until the confidence intervals of all ratings are narrower than `precision` (but at least
+        `min_rounds` and at most `max_rounds`). The games of a round are spread over the workers.
+
+        Arguments:
+            names      (list): players to rate (default: all players found by `import_players`
+                               except the interactive `human`), players that fail to load are left out
+            max_rounds  (int): maximum number of rounds (seeds)
+            min_rounds  (int): minimum number of rounds before stopping early
+            precision (float): stop when every 95 % confidence interval is at most +- this many Elo
+            timeout   (float): time for each turn in seconds (0 for no timeout)
+            seed        (int): seed from which the seeds of all rounds are drawn (random if None)
+            workers     (int): number of worker processes (1 plays all games in this process)
+            sandbox    (bool): if True, every player runs in its own process (`sandbox.py`)
+            cache       (str): JSON-lines file with the results of earlier games (see `ResultCache`)
+            paths      (list): directories searched for players (see `discover_players`)
+
+        Returns: the standings (name, elo, ci, games, score per player, best first) and the
+                 statistics of the league (rounds, games, cached games, seed).
+    '''
+    catalog = game.import_players(paths)
+    if names is None: names = [name for name in catalog if name != 'human']
+
+    # only rate players that can be loaded:
+    players = []
+    for name in names:
+        if name not in catalog:
+            print(f'Skipping unknown player "{name}"')
+            continue
+        try: catalog[name]
+        except Exception as e: print(f'Skipping player "{name}": {e}')
+        else: players.append(name)
+    if len(players) < 2: raise ValueError('a league needs at least two players')
+
+    if seed is None: seed = random.randrange(2**32)
+    rng    = random.Random(seed)
+    hashes = {name: player_hash(catalog.sources[name]) for name in players}
+    cache  = ResultCache(cache)
+    n      = len(players)
+    wins   = [[0] * n for _ in range(n)]
+    stats  = {'rounds': 0, 'games': 0, 'cached': 0, 'seed': seed}
+
+    if workers <= 1:
+        if not game._players: game._init_worker(paths)
+        pool = None
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(workers, initializer=game._init_worker, initargs=(paths, None, True))
+
+    try:
+        for _ in range(max_rounds):
+            s = rng.getrandbits(32)
+            pairings = [(i, j) for i in range(n) for j in range(n) if i != j]
+            keys = [(hashes[players[i]], hashes[players[j]], s, timeout) for i, j in pairings]
+
+            # play all games of the round that are not cached:
+            missing = [k for k, key in enumerate(keys) if cache.get(key) is None]
+            jobs = [(players[pairings[k][0]], players[pairings[k][1]], s, timeout, True, None, None, sandbox) for k in missing]
+            results = pool.map(game.play_round, jobs) if pool is not None else map(game.play_round, jobs)
+            for k, (winner, _, _) in zip(missing, results):
+                cache.put(keys[k], winner)
+
+            for (i, j), key in zip(pairings, keys):
+                if cache.get(key) == 0: wins[i][j] += 1
+                else:                   wins[j][i] += 1
+
+            stats['rounds'] += 1
+            stats['games']  += len(keys)
+            stats['cached'] += len(keys) - len(missing)
+
+            elo, ci = bradley_terry(wins)
+            if stats['rounds'] >= min_rounds and max(ci) <= precision: break
+
+    finally:
+        if pool is not None: pool.shutdown()
+
+    standings = [
+        {'name': players[i], 'elo': elo[i], 'ci': ci[i], 'games': sum(wins[i]) + sum(w[i] for w in wins), 'score': sum(wins[i])}
+        for i in range(n)
+    ]
+    standings.sort(key=lambda p: -p['elo'])
+    return standings, stats
+
+
+#====================================================================================================#
+# Main Function:                                                                                     #
+#====================================================================================================#
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Rate all players in a round-robin league.')
+    parser.add_argument('--players',    nargs='+', help='players to rate (default: all but human)')
+    parser.add_argument('--max-rounds', type=int,   default=100, help='maximum number of rounds (each plays every pairing from both sides)')
+    parser.add_argument('--min-rounds', type=int,   default=4,   help='minimum number of rounds')
+    parser.add_argument('--precision',  type=float, default=50., help='stop when all 95 %% confidence intervals are within +- this many Elo')
+    parser.add_argument('--timeout',    type=float, default=0.,  help='move timeout in seconds (0 for no timeout)')
+    parser.add_argument('--seed',       type=int,   default=0,   help='seed of the rounds (the same seed reuses cached games)')
+    parser.add_argument('--workers',    type=int,   default=os.cpu_count() or 1, help='number of worker processes')
+    parser.add_argument('--sandbox',    action='store_true', help='run every player in its own process, killed on timeout')
+    parser.add_argument('--cache',      default='league.jsonl', help='JSON-lines file caching the results of all games')
+    parser.add_argument('--path',       nargs='+', help='directories to search for player scripts (default: . and $TICTACTOE_PLAYERS)')
+    args = parser.parse_args()
+
+    standings, stats = league(
+        args.players, args.max_rounds, args.min_rounds, args.precision, args.timeout, args.seed,
+        args.workers, args.sandbox, args.cache, args.path
+    )
+
+    print(f'\n{stats["rounds"]:d} rounds, {stats["games"]:d} games ({stats["cached"]:d} cached), seed {stats["seed"]:d}\n')
+    print(f'  {"#":>2s}  {"player":<16s} {"Elo":>7s} {"95% CI":>8s} {"score":>11s}')
+    for rank, p in enumerate(standings, 1):
+        print(f'  {rank:2d}  {p["name"]:<16s} {p["elo"]:7.0f} {"+-" + format(p["ci"], ".0f"):>8s} {p["score"]:5d}/{p["games"]:<5d}')
@@ -0,0 +1,177 @@
+#====================================================================================================#
+# Imports:                                                                                           #
+#====================================================================================================#
+
+from functools import lru_cache
+from operator import itemgetter
+from typing import List
+
+
+#====================================================================================================#
+# Line Index:                                                                                        #
+#====================================================================================================#
+
+# directions of lines as (column step, row step): vertical, horizontal, diagonal up, diagonal down
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+class LineIndex:
+    def __init__(self, n_rows:int, n_cols:int, n_target:int) -> None:
+        '''All lines of `n_target` adjacent cells that win the game on a board of the given size.
+
+            Cells are numbered like the bits of a `Bitboard`: column by column, with `n_rows + 1`
+            positions per column (the topmost one is never part of a line).
+
+            Arguments:
+                n_rows    (int): number of rows of the board
+                n_cols    (int): number of columns of the board
+                n_target  (int): number of adjacent pieces needed to win
+
+            Attributes:
+                lines      (tuple): the cell positions of every line
+                directions (tuple): index into `DIRECTIONS` of every line
+                masks      (tuple): bitmask of every line
+                getters    (tuple): `itemgetter` fetching the cells of every line from a flat board
+                cell_lines (tuple): for every cell position, the ids of all lines through it
+                run_starts (tuple): for every cell position and direction, the bitmask of the first
+                                    cells of all lines through it
+        '''
+        self.n_rows = n_rows
+        self.n_cols = n_cols
+        self.target = n_target
+        self.height = n_rows + 1
+        self.size   = n_cols * self.height
+
+        lines, directions = [], []
+        for d, (dc, dr) in enumerate(DIRECTIONS):
+            for c in range(n_cols):
+                for r in range(n_rows):
+                    cells = [(c + k * dc, r + k * dr) for k in range(n_target)]
+                    if all(0 <= i < n_cols and 0 <= j < n_rows for i, j in cells):
+                        lines.append(tuple(i * self.height + j for i, j in cells))
+                        directions.append(d)
+
+        cell_lines = [[] for _ in range(self.size)]
+        run_starts = [[0] * len(DIRECTIONS) for _ in range(self.size)]
+        for l, (line, d) in enumerate(zip(lines, directions)):
+            for pos in line:
+                cell_lines[pos].append(l)
+                run_starts[pos][d] |= 1 << line[0]
+
+        self.lines      = tuple(lines)
+        self.directions = tuple(directions)
+        self.masks      = tuple(sum(1 << pos for pos in line) for line in lines)
+        self.getters    = tuple(itemgetter(*line) for line in lines)
+        self.cell_lines = tuple(tuple(l) for l in cell_lines)
+        self.run_starts = tuple(tuple(s) for s in run_starts)
+
+@lru_cache(maxsize=32)
+def line_index(n_rows:int, n_cols:int, n_target:int) -> LineIndex:
+    '''The `LineIndex` of a board size and target. Only the most recently used ones are kept.'''
+    return LineIndex(n_rows, n_cols, n_target)
+
+
+#====================================================================================================#
+# Incremental Line Counts:                                                                           #
+#====================================================================================================#
+
+class LineCounts:
+    def __init__(self, index:LineIndex, board:List[List[int]]=None) -> None:
+        '''Number of pieces of both players in every line of `index`, updated cell by cell.
+
+            `push` and `pop` only visit the lines through the changed cell, so the score, wins and
+            threats below are always up to date without scanning the board. Use them like
+            `board[col].append(player)` and `board[col].pop()`.
+
+            Arguments:
+                index (LineIndex): the lines of the board.
+                board      (list): pieces already on the board as a list of columns (optional).
+
+            Attributes:
+                counts  (list): per player, the number of its pieces in every line
+                full    (list): per player, the number of lines it owns completely
+                threats (list): per player, the number of lines missing one piece of it and none of
+                                the opponent's
+        '''
+        self.index   = index
+        self.target  = index.target
+        self.counts  = [[0] * len(index.lines), [0] * len(index.lines)]
+        self.full    = [0, 0]
+        self.threats = [0, 0]
+
+        if board is not None:
+            for col, pieces in enumerate(board):
+                for row, piece in enumerate(pieces): self.push(col, row, piece)
+
+    def push(self, col:int, row:int, player:int) -> None:
+        '''Add a piece of `player` at (col, row).'''
+        target, full, threats = self.target, self.full, self.threats
+        own, other = self.counts[player], self.counts[1 - player]
+
+        for l in self.index.cell_lines[col * self.index.height + row]:
+            a, b = own[l], other[l]
+            if b == 0 and a == target - 1: threats[player] -= 1      # the threat is completed
+            if a == 0 and b == target - 1: threats[1 - player] -= 1  # a threat of the opponent is blocked
+            a += 1
+            own[l] = a
+            if a == target:                    full[player] += 1
+            elif a == target - 1 and b == 0:   threats[player] += 1
+
+    def pop(self, col:int, row:int, player:int) -> None:
+        '''Remove the piece of `player` at (col, row).'''
+        target, full, threats = self.target, self.full, self.threats
+        own, other = self.counts[player], self.counts[1 - player]
+
+        for l in self.index.cell_lines[col * self.index.height + row]:
+            a, b = own[l], other[l]
+            if a == target:                    full[player] -= 1
+            elif a == target - 1 and b == 0:   threats[player] -= 1
+            a -= 1
+            own[l] = a
+            if b == 0 and a == target - 1: threats[player] += 1
+            if a == 0 and b == target - 1: threats[1 - player] += 1
+
+    def score(self, player:int) -> int:
+        '''Complete lines of `player` minus those of the opponent.'''
+        return self.full[player] - self.full[1 - player]
+
+    def completes(self, col:int, row:int, player:int) -> bool:
+        '''Whether a piece of `player` at the empty cell (col, row) completes a line.'''
+        if row >= self.index.n_rows: return False
+        own, target = self.counts[player], self.target - 1
+        return any(own[l] == target for l in self.index.cell_lines[col * self.index.height + row])
+
+
+#====================================================================================================#
+# Evaluation Helpers:                                                                                #
+#====================================================================================================#
+
+def flatten(board:List[List[int]], index:LineIndex) -> List[int]:
+    '''Copy a list of columns into a flat list of cells (-1 for empty cells) numbered like `index`.'''
+    cells = [-1] * index.size
+    for c, col in enumerate(board):
+        start = c * index.height
+        col = col[:index.n_rows]
+        cells[start:start + len(col)] = col
+    return cells
+
+def count_lines(board:List[List[int]], player:int, index:LineIndex) -> int:
+    '''Number of lines completely owned by `player`.'''
+    cells = flatten(board, index)
+    full = (player,) * index.target
+    return sum(1 for get in index.getters if get(cells) == full)
+
+def has_line(board:List[List[int]], player:int, index:LineIndex) -> bool:
+    '''Whether `player` owns at least one complete line.'''
+    cells = flatten(board, index)
+    full = (player,) * index.target
+    return any(get(cells) == full for get in index.getters)
+
+def guess_target(board:List[List[int]], n_rows:int, least:int=3) -> int:
+    '''Smallest target (at least `least`) that no player has reached yet, for players that are called
+       without the game context and do not know the real target.'''
+    target = least
+    while target < max(n_rows, len(board)):
+        index = line_index(n_rows, len(board), target)
+        if not has_line(board, 0, index) and not has_line(board, 1, index): break
+        target += 1
+    return target
@@ -0,0 +1,91 @@
+#====================================================================================================#
+# Imports:                                                                                           #
+#====================================================================================================#
+
+import os
+import time
+import multiprocessing
+from typing import Any, Callable, List, Tuple
+
+
+#====================================================================================================#
+# Worker Side:                                                                                       #
+#====================================================================================================#
+
+# set in every worker process by `_init_worker`:
+_search = None
+_alpha  = None
+
+def _init_worker(search:Callable, alpha:Any) -> None:
+    '''Keep the search function and the shared alpha in the worker (forked, so nothing is pickled).'''
+    global _search, _alpha
+    _search, _alpha = search, alpha
+
+def _run(job:Any) -> Tuple[float, float]:
+    '''Search one job with the best score found so far by any process as alpha, and raise the shared
+       alpha if the score is better. Returns the score (None on timeout) and the alpha used.'''
+    alpha = _alpha.value
+    score = _search(job, alpha)
+    if score is not None and score > alpha:
+        with _alpha.get_lock():
+            if score > _alpha.value: _alpha.value = score
+    return score, alpha
+
+def _ping(_:Any) -> None:
+    '''Empty job used to measure the dispatch overhead.'''
+
+
+#====================================================================================================#
+# Root Pool:                                                                                         #
+#====================================================================================================#
+
+# set in the worker processes of a tournament, self-play or analysis pool (see `stay_serial`):
+_serial = False
+
+def stay_serial() -> None:
+    '''Never start a root pool in this process. Called in the workers of a pool of games (see
+       `game._init_worker`), which already keeps all cores busy.'''
+    global _serial
+    _serial = True
+
+def available() -> bool:
+    '''Whether a root pool can be started here: it needs the fork start method (the players are not
+       importable by name), daemon processes (e.g. sandboxed players) cannot have children, and the
+       workers of a pool of games stay serial.'''
+    return 'fork' in multiprocessing.get_all_start_methods() and not multiprocessing.current_process().daemon and not _serial
+
+class RootPool:
+    def __init__(self, search:Callable[[Any, float], float], workers:int=None) -> None:
+        '''Persistent pool of forked worker processes splitting the root moves of a search.
+
+            Arguments:
+                search (Callable): `search(job, alpha)` returning the score of a job (None on
+                                   timeout). It is bound when the workers are forked.
+                workers     (int): number of worker processes (all cores if None).
+
+            Attributes:
+                startup  (float): seconds it took to start the pool
+                dispatch (float): seconds of a round trip through all workers (the least time a
+                                  parallel iteration costs)
+        '''
+        context = multiprocessing.get_context('fork')
+        self.workers = workers or os.cpu_count() or 1
+        self.alpha   = context.Value('d', float('-inf'))
+
+        t = time.perf_counter()
+        self.pool = context.Pool(self.workers, initializer=_init_worker, initargs=(search, self.alpha))
+        self.pool.map(_ping, range(self.workers), chunksize=1)
+        self.startup = time.perf_counter() - t
+
+        t = time.perf_counter()
+        self.pool.map(_ping, range(self.workers), chunksize=1)
+        self.dispatch = time.perf_counter() - t
+
+    def map(self, jobs:List[Any], alpha:float) -> List[Tuple[float, float]]:
+        '''Search all jobs, starting from a shared alpha. Jobs are handed out one by one in the given
+           order, so earlier (more promising) jobs start first. Returns `(score, alpha used)` per job.'''
+        self.alpha.value = alpha
+        return self.pool.map(_run, jobs, chunksize=1)
+
+    def close(self) -> None:
+        self.pool.terminate()
@@ -1,11 +1,22 @@
 from typing import List, Any, Tuple
 import random
 
-def play(board: List[List[int]], choices: List[int], player: int, memory: Any) -> Tuple[int, Any]:
-    '''Tic-Tac bot that tries to block oponent to the best and guess the best column.'''
+from book import open_book
+from game import GameContext
+from lines import count_lines, guess_target, has_line, line_index
+from evaluation import HAVE_NUMPY, score_moves, winning_moves
+
+def play(board: List[List[int]], choices: List[int], player: int, memory: Any, context: GameContext = None, analysis: Tuple[int, float] = None) -> Tuple[int, Any]:
+    '''Tic-Tac bot that tries to block oponent to the best and guess the best column. An analysis
+    (see analysis.py) passes `analysis` and gets the scores of all columns in memory['stats'].'''
+    board = [list(col) for col in board]  # mutable copy, the game hands out a read-only view.
+    if analysis is not None and not isinstance(memory, dict):
+        memory = {}  # the scores are reported in memory['stats'].
     
     opponent = 1 if player == 0 else 0
-    n_target = memory.get('n_target', 3) if memory else 3  # reading memory or init n_target.
+    # the game tells the size and target, direct callers only get a square board and a guess.
+    n_rows = context.n_rows if context is not None else len(board)
+    n_target = context.n_target if context is not None else guess_target(board, n_rows)
 
     def check_winning_move(board, col, player):
         '''Check for possible wining moves on the board.'''
@@ -16,88 +27,65 @@ def play(board: List[List[int]], choices: List[int], player: int, memory: Any) -
 
     def is_winning(board, player):
         '''Check horizontally, vertically, diagonally for winnig mmoves.'''
-        n_target = memory.get('n_target', 3) if memory else 3  # Start with 3 or use from memory
-
-        # horizontal
-        for row in range(max(len(col) for col in board)):
-            for col in range(len(board) - n_target + 1):
-                if all(len(board[c]) > row and board[c][row] == player for c in range(col, col + n_target)):
-                    return True
-
-        # vertical
-        for col in range(len(board)):
-            if len(board[col]) >= n_target:
-                for row in range(len(board[col]) - n_target + 1):
-                    if all(board[col][row + r] == player for r in range(n_target)):
-                        return True
-
-        # top-left -> bottom-right
-        for row in range(max(len(col) for col in board) - n_target + 1):
-            for col in range(len(board) - n_target + 1):
-                if all(len(board[col + i]) > row + i and board[col + i][row + i] == player for i in range(n_target)):
-                    return True
-
-        # bottom-left -> top-right
-        for row in range(n_target - 1, max(len(col) for col in board)):
-            for col in range(len(board) - n_target + 1):
-                if all(len(board[col + i]) > row - i and board[col + i][row - i] == player for i in range(n_target)):
-                    return True
-
-        return False
+        return has_line(board, player, line_index(n_rows, len(board), n_target))
 
     def heuristic_score(board, col, player):
         '''
             applying heuristic score to the board to find the best move.
             https://medium.com/@ma274/tic-tac-toe-game-using-heuristic-alpha-beta-tree-search-algorithm-26b13273bc5b
         '''
-        score = 0
         board[col].append(player)
-
-        # horizontal
-        for row in range(max(len(col) for col in board)):
-            for c in range(len(board) - n_target + 1):
-                if all(len(board[c + i]) > row and board[c + i][row] == player for i in range(n_target)):
-                    score += 1
-
-        # vertical
-        for c in range(len(board)):
-            if len(board[c]) >= n_target:
-                for row in range(len(board[c]) - n_target + 1):
-                    if all(board[c][row + r] == player for r in range(n_target)):
-                        score += 1
-
-        # top-left -> bottom-right
-        for row in range(max(len(col) for col in board) - n_target + 1):
-            for c in range(len(board) - n_target + 1):
-                if all(len(board[c + i]) > row + i and board[c + i][row + i] == player for i in range(n_target)):
-                    score += 1
-
-        # bottom-left -> top-right
-        for row in range(n_target - 1, max(len(col) for col in board)):
-            for c in range(len(board) - n_target + 1):
-                if all(len(board[c + i]) > row - i and board[c + i][row - i] == player for i in range(n_target)):
-                    score += 1
-
+        score = count_lines(board, player, line_index(n_rows, len(board), n_target))
         board[col].pop()
         return score
 
-    # 1. Check win move avilability.
-    for col in choices:
-        if check_winning_move(board, col, player):
-            return col, memory
+    def heuristic_scores():
+        '''heuristic_score of every choice (numpy scores all columns in one call).'''
+        if HAVE_NUMPY:
+            return score_moves(board, choices, player, n_target)
+        return [heuristic_score(board, col, player) for col in choices]
+
+    def move(col, source, scores=None):
+        '''Return the move, with the scores of all columns if analyzed.'''
+        if analysis is not None:
+            if scores is None:
+                scores = heuristic_scores()
+            by_col = dict(zip(choices, scores))
+            memory['stats'] = {'nodes': len(choices), 'depth': 1, 'source': source, 'scores': [by_col.get(c) for c in range(len(board))]}
+        return col, memory
+
+    # 1. Check win move avilability (numpy checks all columns in one call).
+    if HAVE_NUMPY:
+        wins = winning_moves(board, choices, player, n_target)
+    else:
+        wins = (check_winning_move(board, col, player) for col in choices)
+    for col, win in zip(choices, wins):
+        if win:
+            return move(col, 'win')
 
     # 2. Opponent win move handle.
-    for col in choices:
-        if check_winning_move(board, col, opponent):
-            return col, memory
-
-    # 3. heuristic_score to guess.
+    if HAVE_NUMPY:
+        wins = winning_moves(board, choices, opponent, n_target)
+    else:
+        wins = (check_winning_move(board, col, opponent) for col in choices)
+    for col, win in zip(choices, wins):
+        if win:
+            return move(col, 'block')
+
+    # 3. Play instantly from the opening book / solved positions (see book.py).
+    book = open_book(n_rows, len(board), n_target)
+    if book is not None:
+        entry = book.lookup(board, player)
+        if entry is not None and entry[0] in choices:
+            return move(entry[0], 'book')
+
+    # 4. heuristic_score to guess.
     best_score = -1
     best_col = random.choice(choices)
-    for col in choices:
-        score = heuristic_score(board, col, player)
+    scores = heuristic_scores()
+    for col, score in zip(choices, scores):
         if score > best_score:
             best_score = score
             best_col = col
 
-    return best_col, memory
\ No newline at end of file
+    return move(best_col, 'search', scores)
\ No newline at end of file
@@ -1,196 +1,462 @@
 from typing import List, Any, Tuple
 import random
+import time
+
+import diagnostics
+import parallel
+from book import open_book
+from game import GameContext
+from lines import LineCounts, guess_target, line_index
+from proof import WIN, ProofSolver
+from transposition import EXACT, LOWER, UPPER, TranspositionTable, canonical, zobrist_hash, zobrist_keys
+
+# wall-clock budget per move in seconds (the tournament allows 1s per turn).
+TIME_BUDGET = 0.5
+# in fast mode the search aims for this latency instead, since ties go to the faster player.
+FAST_MODE = False
+FAST_BUDGET = 0.05
+# seconds kept in hand when the game has a move timeout shorter than the budget.
+TIMEOUT_MARGIN = 0.05
+# share of the move budget kept for proving a forced win the search cannot see (see proof.py).
+PROOF_SLICE = 0.3
+# only try to prove positions with at most this many empty cells (None: always).
+PROOF_EMPTY = 30
+# optional cap on the iterative deepening depth (makes node counts reproducible).
+MAX_DEPTH = None
+# order moves by wins, blocks, killer moves, history and distance to the center.
+MOVE_ORDERING = True
+# spread the root moves of deep iterations over this many worker processes (0: serial, None: all cores).
+PARALLEL_WORKERS = 0
+# estimated startup cost of the pool in seconds, it is only started for budgets of twice as much.
+PARALLEL_STARTUP = 0.1
+
+# worker pool of the parallel search, started once and kept for all following moves and games.
+_pool = None
+# in a worker process: search memory per board size (rows and columns) and side to move, kept between the
+# moves of a game (both seats may be played by this module, and table scores belong to one side).
+_worker_memory = {}
+
+
+# diagnostics channel, silent unless enabled (see diagnostics.py).
+log = diagnostics.channel('ai_new')
+
+
+class SearchTimeout(Exception):
+    '''Raised inside minimax when the move budget is used up.'''
+
+
+def _root_pool(budget):
+    '''The worker pool of the parallel search, or None if the search has to stay serial.'''
+    global _pool
+    if PARALLEL_WORKERS == 0 or not parallel.available():
+        return None
+    if _pool is None:
+        if budget < 2 * PARALLEL_STARTUP:
+            return None
+        _pool = parallel.RootPool(_search_root, PARALLEL_WORKERS)
+    return _pool
+
+
+def _search_root(job, alpha):
+    '''Worker side of the parallel search: score one root move with the shared alpha.'''
+    board, player, n_rows, n_target, col, depth, deadline = job
+    memory = _worker_memory.setdefault((n_rows, len(board), player), {})
+    context = GameContext(n_rows, len(board), n_target, 0, float('inf'), 0)
+    return _search(board, [col], player, memory, context, job=(col, depth, alpha, deadline))[0]
+
+
+def play(board: List[List[int]], choices: List[int], player: int, memory: Any, context: GameContext = None, analysis: Tuple[int, float] = None) -> Tuple[int, Any]:
+    '''AI player using iterative deepening minimax with alpha-beta pruning. An analysis (see
+    analysis.py) passes `analysis=(plies, budget)` and gets the exact scores of all columns in
+    memory['stats'].'''
+    return _search(board, choices, player, memory, context, analysis)
+
+
+def _search(board: List[List[int]], choices: List[int], player: int, memory: Any, context: GameContext = None, analysis: Tuple[int, float] = None, job: Tuple[int, int, float, float] = None) -> Tuple[Any, Any]:
+    '''The search of play. With a job `(col, depth, alpha, deadline)` of the parallel search (see
+    _search_root), only that root move is scored and the score (None after the deadline) is returned
+    instead of the move.'''
+    start = time.perf_counter()
+    deadline = start + (FAST_BUDGET if FAST_MODE else TIME_BUDGET)
+    board = [list(col) for col in board]  # mutable copy, the game hands out a read-only view.
 
-def play(board: List[List[int]], choices: List[int], player: int, memory: Any) -> Tuple[int, Any]:
-    '''AI player using minimax algorithm with alpha-beta pruning.'''
-    
     opponent = 1 if player == 0 else 0
     if memory is None:
-        memory = {'n_target': 3}
-    n_target = memory['n_target']
-    # log n_target to a text file
-    with open('n_target.txt', 'a') as f:
-        f.write(str(n_target) + '\n')
-
-    def is_winning(board, player):
-        '''Check horizontally, vertically, diagonally for winning moves.'''
-        # horizontal
-        for row in range(max(len(col) for col in board)):
-            for col in range(len(board) - n_target + 1):
-                if all(len(board[c]) > row and board[c][row] == player for c in range(col, col + n_target)):
-                    return True
-
-        # vertical
-        for col in range(len(board)):
-            if len(board[col]) >= n_target:
-                for row in range(len(board[col]) - n_target + 1):
-                    if all(board[col][row + r] == player for r in range(n_target)):
-                        return True
-
-        # top-left -> bottom-right
-        for row in range(max(len(col) for col in board) - n_target + 1):
-            for col in range(len(board) - n_target + 1):
-                if all(len(board[col + i]) > row + i and board[col + i][row + i] == player for i in range(n_target)):
-                    return True
-
-        # bottom-left -> top-right
-        for row in range(n_target - 1, max(len(col) for col in board)):
-            for col in range(len(board) - n_target + 1):
-                if all(len(board[col + i]) > row - i and board[col + i][row - i] == player for i in range(n_target)):
-                    return True
-
-        return False
-
-    def check_winning_move(board, col, player):
-        '''Check for possible winning moves on the board.'''
-        board[col].append(player)  # select col for each player.
-        result = is_winning(tuple(map(tuple, board)), player)
-        board[col].pop()  # remove the move.
-        return result
-
-    def minimax(board, depth, alpha, beta, maximizing_player):
-        '''Minimax algorithm with alpha-beta pruning.'''
-        board_tuple = tuple(map(tuple, board))
-        if depth == 0 or is_winning(board_tuple, player) or is_winning(board_tuple, opponent):
-            return heuristic_score(board, player) - heuristic_score(board, opponent)
+        memory = {}
+
+    # the game tells the board height, the target and the time limit, direct callers only get
+    # square boards and a guess of the target.
+    if context is not None:
+        n_rows = context.n_rows
+        n_target = context.n_target
+        deadline = min(deadline, context.deadline - TIMEOUT_MARGIN)
+    else:
+        n_rows = len(board)
+        n_target = guess_target(board, n_rows)
+
+    # a single root move to score for a parallel search (see _search_root).
+    if job is not None:
+        deadline = job[3]
+    else:
+        log.debug('n_target %d', n_target)
+
+    # an analysis (see analysis.py) asks for the exact scores of all columns, searched to a depth in
+    # plies and / or for a time budget (no time limit if only the depth is given).
+    max_depth = MAX_DEPTH
+    if analysis is not None:
+        plies, budget = analysis
+        if plies is not None:
+            max_depth = plies - 1
+        if budget is not None:
+            deadline = start + budget
+        elif plies is not None:
+            deadline = float('inf')
+
+    # transposition table and history scores, kept for the whole round.
+    if 'tt' not in memory:
+        memory['keys'] = zobrist_keys(len(board), n_rows)
+        memory['tt'] = TranspositionTable()
+        memory['history'] = [[0] * len(board), [0] * len(board)]
+    keys = memory['keys']
+    tt = memory['tt']
+
+    # older history counts fade out, killer moves only apply to this search.
+    history = memory['history']
+    for counts in history:
+        counts[:] = [c // 2 for c in counts]
+    killers = [[] for _ in range(n_rows * len(board) + 1)]
+    stats = memory['stats'] = {'nodes': 0, 'depth': 0, 'kept': 0, 'source': 'search'}
+
+    # one bitmask of occupied cells per player, kept with every table entry.
+    height = n_rows + 1
+    pieces = [0, 0]
+
+    # the table is keyed by the smaller of the hashes of a position and of its mirror image (see
+    # transposition.canonical), so both hashes are updated with every move. Its scores are from the
+    # point of view of the player who searched, so it is only reused for the same side to move.
+    last = memory.get('last')
+    if last is not None and last[4] == player and all(list(col[:len(prev)]) == list(prev) for col, prev in zip(board, last[0])):
+        # find the new root from the pieces added since the last search and drop all table entries
+        # that are not reachable from it (or from its mirror image) any more.
+        root, root_mirror, pieces = last[1], last[2], list(last[3])
+        for c, col in enumerate(board):
+            for r in range(len(last[0][c]), len(col)):
+                root ^= keys[c][r][col[r]]
+                root_mirror ^= keys[-1 - c][r][col[r]]
+                pieces[col[r]] |= 1 << (c * height + r)
+        # entries kept from earlier moves are replaced first (workers of the parallel search
+        # score several moves from the same root, which is one search):
+        if tuple(pieces) != last[3]:
+            mirrored = [0, 0]
+            for c, col in enumerate(board):
+                for r, piece in enumerate(col):
+                    mirrored[piece] |= 1 << ((len(board) - 1 - c) * height + r)
+            stats['kept'] = tt.prune(pieces, mirrored)
+            tt.new_search()
+        else:
+            stats['kept'] = len(tt.used)
+    else:
+        root = zobrist_hash(board, keys)
+        root_mirror = zobrist_hash(board, keys, mirrored=True)
+        for c, col in enumerate(board):
+            for r, piece in enumerate(col):
+                pieces[piece] |= 1 << (c * height + r)
+        tt.clear()
+
+    def legal_moves(board):
+        '''All columns that are not full yet.'''
+        return [col for col in range(len(board)) if len(board[col]) < n_rows]
+
+    def order_moves(board, moves, turn, ply, first):
+        '''Order moves: the given first move, immediate wins, forced blocks, killer moves, then by history and center distance.'''
+        if not MOVE_ORDERING:
+            return [first] + [col for col in moves if col != first] if first in moves else moves
+
+        center = (len(board) - 1) / 2
+        killer = killers[ply]
+
+        def priority(col):
+            if col == first:
+                return (0,)
+            if lines.completes(col, len(board[col]), turn):
+                return (1,)
+            if lines.completes(col, len(board[col]), 1 - turn):
+                return (2,)
+            if col in killer:
+                return (3, killer.index(col))
+            return (4, -history[turn][col], abs(col - center))
+
+        return sorted(moves, key=priority)
 
+    def cutoff(col, turn, depth, ply):
+        '''Remember a move that caused a beta cutoff as killer move and in the history table.'''
+        killer = killers[ply]
+        if col not in killer:
+            killer.insert(0, col)
+            del killer[2:]
+        history[turn][col] += depth * depth
+
+    def minimax(board, depth, alpha, beta, maximizing_player, h, hm, ply=1):
+        '''Minimax algorithm with alpha-beta pruning and a transposition table keyed by the canonical
+        zobrist hash of h and the hash hm of the mirrored position (moves are stored mirrored if hm is smaller).'''
+        if time.perf_counter() > deadline:
+            raise SearchTimeout()
+        stats['nodes'] += 1
+
+        key, flipped = canonical(h, hm)
+        entry = tt.get(key)
+        if entry is not None and entry[0] >= depth:
+            _, flag, value, _ = entry
+            if flag == EXACT:
+                return value
+            if flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if beta <= alpha:
+                return value
+
+        # leaf, terminal node or full board (the line counts are updated with every move).
+        moves = legal_moves(board)
+        full = lines.full
+        if depth == 0 or full[0] or full[1] or not moves:
+            value = full[player] - full[opponent]
+            tt.put(key, depth, EXACT, value, None, tuple(pieces))
+            return value
+
+        # try the best move of an earlier search first.
+        turn = player if maximizing_player else opponent
+        first = entry[3] if entry is not None else None
+        if flipped and first is not None:
+            first = len(board) - 1 - first
+        moves = order_moves(board, moves, turn, ply, first)
+
+        alpha_orig, beta_orig = alpha, beta
+        best_col = moves[0]
         if maximizing_player:
             max_eval = float('-inf')
-            for col in choices:
+            for col in moves:
+                child = h ^ keys[col][len(board[col])][player]
+                child_mirror = hm ^ keys[-1 - col][len(board[col])][player]
+                cell = 1 << (col * height + len(board[col]))
+                lines.push(col, len(board[col]), player)
                 board[col].append(player)
-                eval = minimax(board, depth - 1, alpha, beta, False)
+                pieces[player] ^= cell
+                eval = minimax(board, depth - 1, alpha, beta, False, child, child_mirror, ply + 1)
+                pieces[player] ^= cell
                 board[col].pop()
-                max_eval = max(max_eval, eval)
+                lines.pop(col, len(board[col]), player)
+                if eval > max_eval:
+                    max_eval, best_col = eval, col
                 alpha = max(alpha, eval)
                 if beta <= alpha:
+                    cutoff(col, turn, depth, ply)
                     break
-            return max_eval
+            value = max_eval
         else:
             min_eval = float('inf')
-            for col in choices:
+            for col in moves:
+                child = h ^ keys[col][len(board[col])][opponent]
+                child_mirror = hm ^ keys[-1 - col][len(board[col])][opponent]
+                cell = 1 << (col * height + len(board[col]))
+                lines.push(col, len(board[col]), opponent)
                 board[col].append(opponent)
-                eval = minimax(board, depth - 1, alpha, beta, True)
+                pieces[opponent] ^= cell
+                eval = minimax(board, depth - 1, alpha, beta, True, child, child_mirror, ply + 1)
+                pieces[opponent] ^= cell
                 board[col].pop()
-                min_eval = min(min_eval, eval)
+                lines.pop(col, len(board[col]), opponent)
+                if eval < min_eval:
+                    min_eval, best_col = eval, col
                 beta = min(beta, eval)
                 if beta <= alpha:
+                    cutoff(col, turn, depth, ply)
                     break
-            return min_eval
-
-    def heuristic_score(board, player):
-        '''Heuristic score to evaluate the board state.'''
-        score = 0
-
-        # horizontal
-        for row in range(max(len(col) for col in board)):
-            for c in range(len(board) - n_target + 1):
-                if all(len(board[c + i]) > row and board[c + i][row] == player for i in range(n_target)):
-                    score += 1
-
-        # vertical
-        for c in range(len(board)):
-            if len(board[c]) >= n_target:
-                for row in range(len(board[c]) - n_target + 1):
-                    if all(board[c][row + r] == player for r in range(n_target)):
-                        score += 1
-
-        # top-left -> bottom-right
-        for row in range(max(len(col) for col in board) - n_target + 1):
-            for c in range(len(board) - n_target + 1):
-                if all(len(board[c + i]) > row + i and board[c + i][row + i] == player for i in range(n_target)):
-                    score += 1
-
-        # bottom-left -> top-right
-        for row in range(n_target - 1, max(len(col) for col in board)):
-            for c in range(len(board) - n_target + 1):
-                if all(len(board[c + i]) > row - i and board[c + i][row - i] == player for i in range(n_target)):
-                    score += 1
-
-        return score
-
-    def adjust_n_target(board, n_target):
-        '''Adjust n_target based on the current game state.'''
-        max_consecutive = 0
-
-        # Check horizontally
-        for row in range(max(len(col) for col in board)):
-            for col in range(len(board)):
-                consecutive = 0
-                for c in range(col, len(board)):
-                    if len(board[c]) > row and board[c][row] == player:
-                        consecutive += 1
-                    else:
-                        break
-                max_consecutive = max(max_consecutive, consecutive)
-
-        # Check vertically
-        for col in range(len(board)):
-            consecutive = 0
-            for row in range(len(board[col])):
-                if board[col][row] == player:
-                    consecutive += 1
-                else:
-                    break
-            max_consecutive = max(max_consecutive, consecutive)
-
-        # Check top-left -> bottom-right
-        for row in range(max(len(col) for col in board)):
-            for col in range(len(board)):
-                consecutive = 0
-                for i in range(min(len(board) - col, max(len(col) for col in board) - row)):
-                    if len(board[col + i]) > row + i and board[col + i][row + i] == player:
-                        consecutive += 1
-                    else:
-                        break
-                max_consecutive = max(max_consecutive, consecutive)
-
-        # Check bottom-left -> top-right
-        for row in range(max(len(col) for col in board)):
-            for col in range(len(board)):
-                consecutive = 0
-                for i in range(min(len(board) - col, row + 1)):
-                    if len(board[col + i]) > row - i and board[col + i][row - i] == player:
-                        consecutive += 1
-                    else:
-                        break
-                max_consecutive = max(max_consecutive, consecutive)
-
-        # Adjust n_target based on the maximum consecutive marks found
-        if max_consecutive >= n_target:
-            n_target += 1
-        elif max_consecutive < n_target - 1:
-            n_target = max(3, max_consecutive + 1)  # Ensure n_target is at least 3
-        return n_target
-
-    # Adjust n_target before making a move
-    n_target = adjust_n_target(board, n_target)
-    memory['n_target'] = n_target
-
-    # 1. Check win move availability.
-    for col in choices:
-        if check_winning_move(board, col, player):
-            return col, memory
-
-    # 2. Opponent win move handle.
-    for col in choices:
-        if check_winning_move(board, col, opponent):
-            return col, memory
-
-    # 3. Use minimax to guess the best move.
-    best_score = float('-inf')
-    best_col = random.choice(choices)
-    for col in choices:
+            value = min_eval
+
+        if value <= alpha_orig:
+            flag = UPPER
+        elif value >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        tt.put(key, depth, flag, value, len(board) - 1 - best_col if flipped else best_col, tuple(pieces))
+        return value
+
+    # stored scores are only valid for the n_target they were computed with.
+    if memory.get('tt_target') != n_target:
+        tt.clear()
+        memory['tt_target'] = n_target
+
+    # pieces of both players in every line, kept up to date by the search (push before append, pop
+    # after pop), so evaluating a position only costs the lines through the cells that changed.
+    lines = LineCounts(line_index(n_rows, len(board), n_target), board)
+
+    def score_root(col, depth, alpha):
+        '''Score a root move by searching its position to the given depth, with alpha as lower bound.'''
+        child = root ^ keys[col][len(board[col])][player]
+        child_mirror = root_mirror ^ keys[-1 - col][len(board[col])][player]
+        cell = 1 << (col * height + len(board[col]))
+        lines.push(col, len(board[col]), player)
         board[col].append(player)
-        score = minimax(board, 3, float('-inf'), float('inf'), False)
-        board[col].pop()
-        if score > best_score:
-            best_score = score
-            best_col = col
-
-    # Check if there are n_target consecutive marks in any direction
-    board[best_col].append(player)
-    if is_winning(tuple(map(tuple, board)), player):
-        memory['n_target'] += 1
-    board[best_col].pop()
+        pieces[player] ^= cell
+        try:
+            return minimax(board, depth, alpha, float('inf'), False, child, child_mirror)
+        finally:
+            pieces[player] ^= cell
+            board[col].pop()
+            lines.pop(col, len(board[col]), player)
+
+    # score one root move in a worker process of the parallel search.
+    if job is not None:
+        col, depth, alpha, _ = job
+        memory['last'] = (tuple(map(tuple, board)), root, root_mirror, tuple(pieces), player)
+        try:
+            return score_root(col, depth, alpha), memory
+        except SearchTimeout:
+            return None, memory
+
+    def instant_move():
+        '''A move found without searching and where it comes from, or None.'''
+        # 1. Check win move availability.
+        for col in choices:
+            if lines.completes(col, len(board[col]), player):
+                return col, 'win'
+
+        # 2. Opponent win move handle.
+        for col in choices:
+            if lines.completes(col, len(board[col]), opponent):
+                return col, 'block'
+
+        # 3. Play instantly from the opening book / solved positions (see book.py).
+        book = open_book(n_rows, len(board), n_target)
+        if book is not None:
+            entry = book.lookup(board, player)
+            if entry is not None and entry[0] in choices:
+                return entry[0], 'book'
+        return None
+
+    # an analysis still searches to score all columns, but reports the instant move.
+    instant = instant_move()
+    if instant is not None:
+        stats['source'] = instant[1]
+        if analysis is None:
+            return instant[0], memory
+
+    # 4. Play the next move of a win proven on an earlier turn (see step 6). The solver keeps its
+    # table for the whole round, so this is a single lookup.
+    solver = memory.get('proof') if analysis is None else None
+    if solver is not None and solver.state.target == n_target:
+        move = solver.proven(board, player)
+        if move in choices:
+            stats['source'] = 'proof'
+            log.info('move %d: proven win, %.1f ms', move, (time.perf_counter() - start) * 1000.)
+            return move, memory
+
+    # forced wins need lines that only miss one piece, without them the budget is left to the search.
+    empty = sum(n_rows - len(col) for col in board)
+    prove = analysis is None and lines.threats[player] > 0 and (PROOF_EMPTY is None or empty <= PROOF_EMPTY)
+    if prove:
+        if solver is None or solver.state.target != n_target:
+            solver = memory['proof'] = ProofSolver(n_rows, len(board), n_target)
+        # the search leaves a slice of the budget to the solver.
+        proof_deadline = deadline
+        deadline = time.perf_counter() + (1. - PROOF_SLICE) * (deadline - time.perf_counter())
+
+    # 5. Use iterative deepening minimax to guess the best move.
+    def search(depth, first):
+        '''Search all root moves to the given depth, starting with the best move of the last iteration.'''
+        best_score = float('-inf')
+        best_col = first
+        scores = {}
+        for col in order_moves(board, list(root_moves), player, 0, first):
+            # (an analysis searches every move with a full window to get its exact score)
+            score = scores[col] = score_root(col, depth, float('-inf') if analysis is not None else best_score)
+            if score > best_score:
+                best_score = score
+                best_col = col
+        if analysis is not None:
+            stats['scores'] = scores
+        return best_col
+
+    def search_parallel(depth, first):
+        '''Like search, but only the first move is searched here. All other root moves are scored by
+        the worker processes, which share the best score found so far as alpha.'''
+        moves = order_moves(board, list(root_moves), player, 0, first)
+        best_score = score_root(moves[0], depth, float('-inf'))
+        best_col = moves[0]
+
+        position = tuple(map(tuple, board))
+        jobs = [(position, player, n_rows, n_target, col, depth, deadline) for col in moves[1:]]
+        results = pool.map(jobs, best_score)
+        if any(score is None for score, _ in results):
+            raise SearchTimeout()
+
+        # the best exact score is the best score overall. Like the serial search, prefer the first
+        # move reaching it: moves before it whose bound (a score not above the alpha it was searched
+        # with) ties it are searched again just below the best score (scores are integers).
+        top = max([best_score] + [score for score, alpha in results if score > alpha])
+        for col, (score, alpha) in zip(moves[1:], results):
+            if score > best_score and (score > alpha or score >= top and score_root(col, depth, top - 1) >= top):
+                best_score = score
+                best_col = col
+        return best_col
+
+    # on a symmetric board (like the empty one) mirrored moves are equivalent, only one of each
+    # pair is searched.
+    root_moves = list(choices)
+    if board == board[::-1]:
+        root_moves = [col for col in choices if col <= len(board) - 1 - col]
+
+    # start with the move the previous search expected here, if any.
+    key, flipped = canonical(root, root_mirror)
+    entry = tt.get(key)
+    best_col = entry[3] if entry is not None and entry[3] is not None else None
+    if flipped and best_col is not None:
+        best_col = len(board) - 1 - best_col
+    if best_col not in root_moves:
+        best_col = random.choice(root_moves)
+    memory['last'] = (tuple(map(tuple, board)), root, root_mirror, tuple(pieces), player)
+
+    # iterations that take longer than a few round trips through the pool are searched in parallel.
+    pool = _root_pool(deadline - start) if len(root_moves) > 1 and analysis is None else None
+    elapsed = 0
+    stats['parallel'] = 0
+    for depth in range(empty if max_depth is None else min(empty, max_depth + 1)):
+        iteration = time.perf_counter()
+        try:
+            if pool is not None and elapsed > 4 * pool.dispatch:
+                best_col = search_parallel(depth, best_col)
+                stats['parallel'] += 1
+            else:
+                best_col = search(depth, best_col)
+        except SearchTimeout:
+            break
+        stats['depth'] = depth + 1
+        elapsed = time.perf_counter() - iteration
+
+        # do not start an iteration that will most likely not finish in time.
+        now = time.perf_counter()
+        if now + 2 * (now - iteration) > deadline:
+            break
+
+    # 6. Try to prove a forced win beyond the horizon of the search, unless the search already
+    # reached the end of the game.
+    if prove and stats['depth'] < empty:
+        proof = solver.solve(board, player, proof_deadline, loss=False)
+        stats['proof'], stats['proof_nodes'] = proof.value, proof.nodes
+        if proof.value == WIN and proof.move in choices:
+            best_col = proof.move
+            stats['source'] = 'proof'
+
+    # the score of every column (None for full columns and if no iteration finished), mirrored
+    # moves of a symmetric board were only searched once.
+    if analysis is not None:
+        scores = stats.get('scores', {})
+        stats['scores'] = [scores.get(col, scores.get(len(board) - 1 - col)) if col in choices else None for col in range(len(board))]
+        if instant is not None:
+            best_col = instant[0]
 
+    log.info('move %d: depth %d, %d nodes (%d parallel iterations), %d table entries kept, %.1f ms',
+             best_col, stats['depth'], stats['nodes'], stats['parallel'], stats['kept'], (time.perf_counter() - start) * 1000.)
     return best_col, memory
\ No newline at end of file
@@ -0,0 +1,198 @@
+#====================================================================================================#
+# Imports:                                                                                           #
+#====================================================================================================#
+
+import math
+import random
+import time
+from typing import Any, List, Tuple
+
+from game import GameContext
+
+#====================================================================================================#
+# Settings:                                                                                          #
+#====================================================================================================#
+
+# seconds of simulations per move, more simulations give better visit counts at the root.
+TIME_BUDGET = 0.5
+# optional cap on the number of simulations per move (makes the moves reproducible for a given seed).
+MAX_SIMULATIONS = None
+# exploration constant of the UCT formula.
+EXPLORATION = 1.4
+# simulations stop this many seconds before the move deadline of the game, which leaves time to
+# pick the most visited move and keep its subtree.
+TIMEOUT_MARGIN = 0.05
+
+#====================================================================================================#
+# Search Tree:                                                                                       #
+#====================================================================================================#
+
+class Node:
+    '''Node of the search tree: the position after `player` dropped a piece into column `move`.'''
+    __slots__ = ('move', 'player', 'parent', 'children', 'untried', 'result', 'visits', 'wins')
+
+    def __init__(self, move:int, player:int, parent:'Node', untried:List[int], result:int=None) -> None:
+        self.move     = move
+        self.player   = player
+        self.parent   = parent
+        self.children = {}
+        self.untried  = untried   # legal moves without a child node yet
+        self.result   = result    # winner (-1 for a full board) if the game is over here, else None
+        self.visits   = 0
+        self.wins     = 0.        # from the view of `player`, a full board counts half
+
+def run_chains(shifts:Tuple[int, ...], n_target:int) -> Tuple[Tuple[int, ...], ...]:
+    '''Shift amounts per direction that reduce a bitboard to the first cells of all runs of
+       `n_target` pieces. Runs double in length per step, so there are about log2(n_target) steps.'''
+    steps, length = [], 1
+    while length < n_target:
+        steps.append(min(length, n_target - length))
+        length += steps[-1]
+    return tuple(tuple(step * shift for step in steps) for shift in shifts)
+
+def has_run(bits:int, chains:Tuple[Tuple[int, ...], ...]) -> bool:
+    '''Whether the bitboard `bits` holds a run of pieces in any direction (see `run_chains`).'''
+    for chain in chains:
+        run = bits
+        for shift in chain:
+            run &= run >> shift
+        if run: return True
+    return False
+
+#====================================================================================================#
+# Play Function:                                                                                     #
+#====================================================================================================#
+
+def play(board:List[List[int]], choices:List[int], player:int, memory:Any, context:GameContext=None) -> Tuple[int, Any]:
+    '''Monte Carlo tree search with UCT selection and random playouts on integer bitboards.
+
+        The tree of the last move is kept in memory, and its subtree of the current position is
+        searched further. `memory['stats']` holds the number of simulations of the move.
+
+        Arguments:
+            board (List[List[int]]): the game plan as a list of columns. Each column is a list of integer ids signifying the player who placed the piece.
+            choices     (List[int]): the possible moves allowed by the game rules.
+            player            (int): integer id of the current player in the game plan.
+            memory            (any): persistent information passed as the second output in the previous round. Initialized with None.
+            context   (GameContext): target and time limit of the game (optional, see game.py).
+
+        Returns   (Tuple[int, Any]): A tuple of the selected column (int) and the memory object for the next iteration (can be anything).
+    '''
+    deadline = time.perf_counter() + TIME_BUDGET
+    if context is not None: deadline = min(deadline, context.deadline - TIMEOUT_MARGIN)
+    if memory is None: memory = {}
+    memory['stats'] = {'nodes': 0, 'simulations': 0, 'reused': 0}
+
+    # board geometry (square boards without the game context), bits are laid out like in bitboard.py:
+    n_cols   = len(board)
+    n_rows   = context.n_rows if context is not None else len(board)
+    height   = n_rows + 1
+    shifts   = (1, height, height + 1, height - 1)
+
+    bits     = [0, 0]
+    heights  = [len(col) for col in board]
+    for c, col in enumerate(board):
+        for r, piece in enumerate(col):
+            bits[piece] |= 1 << (c * height + r)
+
+    # the target of the game, or if called without the game context the smallest target that nobody
+    # has reached yet.
+    if context is not None: n_target = context.n_target
+    else:
+        n_target = 3
+        while has_run(bits[0], run_chains(shifts, n_target)) or has_run(bits[1], run_chains(shifts, n_target)): n_target += 1
+    chains = run_chains(shifts, n_target)
+
+    def wins_with(col, who):
+        '''Whether dropping a piece of `who` into column `col` wins.'''
+        return has_run(bits[who] | 1 << (col * height + heights[col]), chains)
+
+    # 1. play a winning move, 2. block a winning move of the opponent:
+    for who in (player, 1 - player):
+        for col in choices:
+            if wins_with(col, who):
+                memory.pop('tree', None)
+                return col, memory
+
+    # 3. reuse the subtree of the current position (one opponent move below our last move):
+    root, snapshot, target = memory.get('tree', (None, None, None))
+    if root is not None and target == n_target:
+        added = [c for c in range(n_cols) if heights[c] != snapshot[c]]
+        if len(added) == 1 and heights[added[0]] == snapshot[added[0]] + 1 and root.result is None:
+            root = root.children.get(added[0])
+        else:
+            root = None
+    if root is None or root.player == player or root.result is not None:
+        root = Node(-1, 1 - player, None, list(choices))
+    root.parent = None
+    reused = root.visits
+
+    def playout(bits, heights, turn):
+        '''Random moves until a player wins (returns the player) or the board is full (returns -1).'''
+        free = [c for c in range(n_cols) if heights[c] < n_rows]
+        rand = random.random  # much cheaper than randrange
+        while free:
+            i = int(rand() * len(free))
+            col = free[i]
+            pos = col * height + heights[col]
+            heights[col] += 1
+            if heights[col] == n_rows:
+                free[i] = free[-1]
+                free.pop()
+
+            bits[turn] |= 1 << pos
+            if has_run(bits[turn], chains): return turn
+            turn = 1 - turn
+        return -1
+
+    # 4. search until the budget is used up:
+    simulations = 0
+    while (MAX_SIMULATIONS is None or simulations < MAX_SIMULATIONS) and time.perf_counter() < deadline:
+        node = root
+        sim_bits = bits[:]
+        sim_heights = heights[:]
+
+        # selection (UCT) through fully expanded nodes:
+        while not node.untried and node.children:
+            log_n = EXPLORATION * math.sqrt(math.log(node.visits))
+            best, best_value = None, -1.
+            for child in node.children.values():
+                value = child.wins / child.visits + log_n / math.sqrt(child.visits)
+                if value > best_value: best, best_value = child, value
+            node = best
+            sim_bits[node.player] |= 1 << (node.move * height + sim_heights[node.move])
+            sim_heights[node.move] += 1
+
+        # expansion of one untried move:
+        if node.untried:
+            col = node.untried.pop(random.randrange(len(node.untried)))
+            turn = 1 - node.player
+            sim_bits[turn] |= 1 << (col * height + sim_heights[col])
+            sim_heights[col] += 1
+
+            if has_run(sim_bits[turn], chains): child = Node(col, turn, node, [], turn)
+            else:
+                moves = [c for c in range(n_cols) if sim_heights[c] < n_rows]
+                child = Node(col, turn, node, moves, None if moves else -1)
+            node.children[col] = child
+            node = child
+
+        # simulation:
+        winner = node.result if node.result is not None else playout(sim_bits, sim_heights, 1 - node.player)
+
+        # backpropagation:
+        while node is not None:
+            node.visits += 1
+            if   winner == node.player: node.wins += 1.
+            elif winner < 0:            node.wins += .5
+            node = node.parent
+        simulations += 1
+
+    # play the most visited move and keep its subtree for the next turn:
+    best = max(root.children.values(), key=lambda child: child.visits, default=None)
+    col = best.move if best is not None else random.choice(choices)
+
+    heights[col] += 1
+    memory['tree'] = (best, tuple(heights), n_target)
+    memory['stats'] = {'nodes': simulations, 'simulations': simulations, 'reused': reused}
+    return col, memory
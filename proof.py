@@ -0,0 +1,248 @@
+#====================================================================================================#
+# Imports:                                                                                           #
+#====================================================================================================#
+
+import time
+from typing import List, NamedTuple, Tuple
+
+from bitboard import Bitboard
+from transposition import TranspositionTable
+
+
+#====================================================================================================#
+# Results:                                                                                           #
+#====================================================================================================#
+
+# values of a solved position for the player to move:
+WIN     = 1
+DRAW    = 0      # neither player can force a line (the board fills up with best play)
+LOSS    = -1
+UNKNOWN = None   # not solved in time
+
+# proof and disproof numbers of decided nodes:
+INF = 10**9
+
+# child thresholds grow by this factor over the second best child (the 1 + epsilon trick of df-pn),
+# so the search switches between siblings less often:
+EPSILON = .25
+
+class Proof(NamedTuple):
+    '''Result of `ProofSolver.solve`.'''
+    value:   int     # WIN, DRAW, LOSS or UNKNOWN
+    move:    int     # the winning move, a move keeping the draw, or -1
+    nodes:   int     # nodes searched
+    seconds: float   # time of the search
+
+class ProofTimeout(Exception):
+    '''Raised when the solver reaches its deadline.'''
+
+
+#====================================================================================================#
+# Depth-First Proof-Number Search:                                                                   #
+#====================================================================================================#
+
+class ProofSolver:
+    def __init__(self, n_rows:int, n_cols:int, n_target:int, size_bits:int=18) -> None:
+        '''Depth-first proof-number search (df-pn) proving that one player (the attacker) can force a
+           line. It needs no evaluation and follows the narrowest threat sequences first, so it
+           finds deep forced wins that a depth limited minimax misses.
+
+            Nodes where the attacker moves need one winning move (OR nodes), nodes where the defender
+            moves need all moves to be winning for the attacker (AND nodes). Immediate wins decide a
+            node, and a single immediate threat of the opponent leaves only the blocking move.
+
+            Proof and disproof numbers are kept in a fixed size `TranspositionTable` keyed by the
+            canonical key of the position (see `Bitboard.canonical_key`) and the node type. Entries
+            that took more work replace those that took less, and decided entries are only replaced
+            by decided ones, so the table can be kept for all moves of a game: the positions after
+            the replies inside a proof are decided by a single lookup on later turns (see `proven`).
+
+            Arguments:
+                n_rows    (int): number of rows of the board
+                n_cols    (int): number of columns of the board
+                n_target  (int): number of adjacent pieces needed to win
+                size_bits (int): the table holds `2**size_bits` entries
+        '''
+        self.state    = Bitboard(n_rows, n_cols, n_target)
+        self.order    = sorted(range(n_cols), key=lambda c: abs(c - (n_cols - 1) / 2))
+        self.table    = TranspositionTable(size_bits)
+        self.nodes    = 0
+        self.deadline = float('inf')
+
+    def lookup(self, player:int, attacker:int) -> Tuple[int, int, int]:
+        '''Proof and disproof number and best move of the position with `player` to move (1, 1 and
+           -1 if it was not searched yet).'''
+        key, flipped = self.state.canonical_key(player)
+        entry = self.table.get(hash((key, player == attacker)))
+        if entry is None: return 1, 1, -1
+        pn, dn = entry[2]
+        move = entry[3]
+        if flipped and move >= 0: move = self.state.n_cols - 1 - move
+        return pn, dn, move
+
+    def store(self, player:int, attacker:int, pn:int, dn:int, move:int, work:int) -> None:
+        '''Store the proof and disproof number and best move of the position with `player` to move.'''
+        key, flipped = self.state.canonical_key(player)
+        if flipped and move >= 0: move = self.state.n_cols - 1 - move
+        self.table.put(hash((key, player == attacker)), INF if pn == 0 or dn == 0 else work, 0, (pn, dn), move)
+
+    def expand(self, player:int, attacker:int) -> Tuple[List[int], Tuple[int, int, int]]:
+        '''The moves of `player` worth searching, or the proof and disproof number and best move of a
+           node that is decided without searching (`(moves, None)` or `(None, decided)`).'''
+        state = self.state
+        moves = [c for c in self.order if state.heights[c] < state.n_rows]
+        is_or = player == attacker
+
+        # a full board is a draw, not won by the attacker:
+        if not moves: return None, (INF, 0, -1)
+
+        for col in moves:
+            pos = state.push(col, player)
+            win = state.is_win(player, pos)
+            state.pop()
+            if win: return None, ((0, INF, col) if is_or else (INF, 0, col))
+
+        # the opponent wins next unless its single immediate threat is blocked:
+        threats = []
+        for col in moves:
+            pos = state.push(col, 1 - player)
+            if state.is_win(1 - player, pos): threats.append(col)
+            state.pop()
+        if len(threats) > 1: return None, ((INF, 0, threats[0]) if is_or else (0, INF, threats[0]))
+        return threats or moves, None
+
+    def mid(self, player:int, attacker:int, thpn:int, thdn:int) -> Tuple[int, int]:
+        '''Search the position with `player` to move until its proof number reaches `thpn` or its
+           disproof number reaches `thdn` (multiple iterative deepening of df-pn).'''
+        self.nodes += 1
+        if self.nodes & 63 == 0 and time.perf_counter() > self.deadline: raise ProofTimeout()
+
+        moves, decided = self.expand(player, attacker)
+        if decided is not None:
+            self.store(player, attacker, *decided, 1)
+            return decided[:2]
+
+        # the numbers of the children are kept here, not looked up again after searching one of
+        # them (its entry may have lost its slot in the table):
+        state = self.state
+        is_or = player == attacker
+        start = self.nodes
+        children = []
+        for col in moves:
+            state.push(col, player)
+            children.append(self.lookup(1 - player, attacker)[:2])
+            state.pop()
+
+        while True:
+            # OR nodes need one proven child, AND nodes all of them (and the other way round for
+            # disproofs). The best child has the smallest number that decides the node:
+            if is_or:
+                pn = min(c[0] for c in children)
+                dn = min(INF, sum(c[1] for c in children))
+                ranked = sorted(range(len(moves)), key=lambda i: children[i][0])
+            else:
+                pn = min(INF, sum(c[0] for c in children))
+                dn = min(c[1] for c in children)
+                ranked = sorted(range(len(moves)), key=lambda i: children[i][1])
+            best = ranked[0]
+            if pn >= thpn or dn >= thdn: break
+
+            child_pn, child_dn = children[best]
+            second = children[ranked[1]][0 if is_or else 1] if len(moves) > 1 else INF
+            if is_or:
+                child_thpn = min(thpn, int(second * (1. + EPSILON)) + 1)
+                child_thdn = min(INF, thdn - dn + child_dn)
+            else:
+                child_thpn = min(INF, thpn - pn + child_pn)
+                child_thdn = min(thdn, int(second * (1. + EPSILON)) + 1)
+
+            state.push(moves[best], player)
+            try: children[best] = self.mid(1 - player, attacker, child_thpn, child_thdn)
+            finally: state.pop()
+
+        self.store(player, attacker, pn, dn, moves[best], self.nodes - start + 1)
+        return pn, dn
+
+    def prove(self, player:int, attacker:int, deadline:float) -> Tuple[int, int, int]:
+        '''Try to decide whether `attacker` can force a line from the current position with `player`
+           to move. Returns the proof and disproof number and the best move (a proof number of 0
+           proves the win, a disproof number of 0 disproves it), or None at the deadline.'''
+        self.deadline = deadline
+        try: pn, dn = self.mid(player, attacker, INF, INF)
+        except ProofTimeout: return None
+        return pn, dn, self.lookup(player, attacker)[2]
+
+    def proven(self, board:List[List[int]], player:int) -> int:
+        '''The winning move of a position with `player` to move if the table holds its proof, or -1
+           (a single lookup, for the later moves of a proven line).'''
+        state = self.state
+        for col in range(len(board)):
+            for piece in board[col]: state.push(col, piece)
+        try:
+            pn, _, move = self.lookup(player, player)
+            return move if pn == 0 else -1
+        finally:
+            while state.moves: state.pop()
+
+    def solve(self, board:List[List[int]], player:int, deadline:float=float('inf'), loss:bool=True) -> Proof:
+        '''Solve a position with `player` to move until the deadline (a `time.perf_counter` time).
+
+            The solver first tries to prove a win for `player` with half of the time, then (if `loss`)
+            a win of the opponent with the rest. If neither can force a line, the position is a draw.
+
+            Returns (Proof): the value, the winning move (WIN) or a move that keeps the draw (DRAW),
+                             the nodes and the time of the search.
+        '''
+        state = self.state
+        for col in range(len(board)):
+            for piece in board[col]: state.push(col, piece)
+
+        start, self.nodes = time.perf_counter(), 0
+        value, move = UNKNOWN, -1
+        try:
+            win = self.prove(player, player, start + (deadline - start) / 2 if loss else deadline)
+            if win is not None and win[0] == 0:
+                value, move = WIN, win[2]
+
+            elif loss:
+                lost = self.prove(player, 1 - player, deadline)
+                if lost is not None and lost[0] == 0:
+                    value = LOSS
+                elif lost is not None and win is not None:
+                    # (the opponent's win is disproved by a move that avoids it)
+                    value, move = DRAW, lost[2]
+
+        finally:
+            while state.moves: state.pop()
+
+        return Proof(value, move, self.nodes, time.perf_counter() - start)
+
+
+#====================================================================================================#
+# Main Function:                                                                                     #
+#====================================================================================================#
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Solve a position by proof-number search.')
+    parser.add_argument('--size',    type=int, default=5, help='board size n (n x n board)')
+    parser.add_argument('--target',  type=int, default=4, help='number of adjacent pieces needed to win')
+    parser.add_argument('--moves',   type=int, nargs='*', default=[], help='columns played so far, player 0 first')
+    parser.add_argument('--seconds', type=float, default=60., help='time limit in seconds')
+    parser.add_argument('--bits',    type=int, default=20, help='log2 of the number of table entries')
+    args = parser.parse_args()
+
+    board = [[] for _ in range(args.size)]
+    for i, col in enumerate(args.moves):
+        if not 0 <= col < args.size or len(board[col]) >= args.size: parser.error(f'illegal move {col:d}')
+        board[col].append(i % 2)
+    player = len(args.moves) % 2
+
+    solver = ProofSolver(args.size, args.size, args.target, args.bits)
+    result = solver.solve(board, player, time.perf_counter() + args.seconds)
+
+    names = {WIN: 'win', DRAW: 'draw', LOSS: 'loss', UNKNOWN: 'unknown'}
+    print(f'{args.size:d}x{args.size:d}, target {args.target:d}, player {player:d} to move: {names[result.value]}'
+          + (f', play {result.move:d}' if result.move >= 0 else ''))
+    print(f'{result.nodes:d} nodes in {result.seconds:.2f} s ({result.nodes / max(result.seconds, 1e-9):.0f} nodes per second)')
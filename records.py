@@ -0,0 +1,235 @@
+#====================================================================================================#
+# Imports:                                                                                           #
+#====================================================================================================#
+
+import os
+import mmap
+import struct
+from array import array
+from typing import Any, Dict, Iterator, List, NamedTuple, Tuple
+
+from bitboard import Bitboard
+from events import GAME_START, TURN_END, MOVE_APPLIED, GAME_END
+
+
+#====================================================================================================#
+# File Format:                                                                                       #
+#====================================================================================================#
+
+# file header: magic, version
+MAGIC   = b'TTTR'
+VERSION = 1
+HEADER  = struct.Struct('<4sB3x')
+
+# game header: seed (-1 if unknown), n_rows, n_cols, n_target, first player, winner, reason, number
+# of moves. It is followed by one byte per move (the column) and one float32 per move (think time).
+GAME    = struct.Struct('<qBBBBbBH')
+
+# how a game ended (index stored as the reason byte):
+REASONS = ('line', 'full', 'exception', 'timeout', 'illegal')
+
+class GameRecord(NamedTuple):
+    '''Everything needed to replay a finished game.'''
+    n_rows:   int
+    n_cols:   int
+    n_target: int
+    seed:     int
+    first:    int
+    winner:   int
+    reason:   str
+    moves:    bytes
+    times:    Tuple[float, ...]
+
+    def player(self, ply:int) -> int:
+        '''Player of the move with index `ply`.'''
+        return self.first ^ (ply & 1)
+
+def pack(record:GameRecord) -> bytes:
+    '''Serialize a game record (header, columns, times).'''
+    if len(record.times) != len(record.moves):
+        raise ValueError('a game record needs exactly one time per move')
+
+    return GAME.pack(
+        record.seed, record.n_rows, record.n_cols, record.n_target, record.first, record.winner,
+        REASONS.index(record.reason), len(record.moves)
+    ) + bytes(record.moves) + array('f', record.times).tobytes()
+
+
+#====================================================================================================#
+# Writing:                                                                                           #
+#====================================================================================================#
+
+class GameWriter:
+    def __init__(self, path:str, buffer_size:int=1 << 16) -> None:
+        '''Append-only writer of game records. Nothing but the write buffer is kept in memory.
+
+            Arguments:
+                path        (str): the record file (created with its header if it does not exist).
+                buffer_size (int): size of the write buffer in bytes.
+        '''
+        self.file = open(path, 'ab', buffering=buffer_size)
+        if self.file.tell() == 0:
+            self.file.write(HEADER.pack(MAGIC, VERSION))
+            self.file.flush()
+
+    def write(self, record:GameRecord) -> None:
+        '''Append a record with a single write call (several processes can append to one file).'''
+        self.file.write(pack(record))
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> 'GameWriter':
+        return self
+
+    def __exit__(self, *args:Any) -> None:
+        self.close()
+
+class GameRecorder:
+    def __init__(self, path:str, seed:int=-1) -> None:
+        '''Game hook (see `events.py`) appending a record of every finished game to a file.
+
+            Arguments:
+                path (str): the record file.
+                seed (int): seed of the recorded games (-1 if unknown).
+        '''
+        self.writer = GameWriter(path)
+        self.seed   = seed
+        self.think  = 0.
+
+    def __call__(self, event:str, data:Dict[str, Any]) -> None:
+        if event == MOVE_APPLIED:
+            self.moves.append(data['move'])
+            self.times.append(self.think)
+
+        elif event == TURN_END:
+            self.think = data['think'] or 0.
+
+        elif event == GAME_START:
+            self.size  = (data['n_rows'], data['n_cols'], data['n_target'])
+            self.first = data['first']
+            self.moves = bytearray()
+            self.times = array('f')
+
+        elif event == GAME_END:
+            self.writer.write(GameRecord(
+                *self.size, self.seed, self.first, data['winner'], data['reason'], bytes(self.moves), tuple(self.times)
+            ))
+            self.writer.flush()
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+#====================================================================================================#
+# Reading and Replay:                                                                                #
+#====================================================================================================#
+
+class GameReader:
+    def __init__(self, path:str) -> None:
+        '''Memory mapped, random access view of a record file.
+
+            Opening scans the game headers once to index the records (a truncated last record, e.g.
+            of an interrupted tournament, is ignored).
+
+            Arguments:
+                path (str): the record file.
+        '''
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size > 0 else b''
+
+        if len(self.data) < HEADER.size or HEADER.unpack_from(self.data, 0) != (MAGIC, VERSION):
+            raise ValueError(f'{path} is not a record file of version {VERSION:d}')
+
+        # offsets of all complete records:
+        self.offsets = array('Q')
+        offset = HEADER.size
+        while offset + GAME.size <= len(self.data):
+            n_moves = GAME.unpack_from(self.data, offset)[-1]
+            end = offset + GAME.size + 5 * n_moves
+            if end > len(self.data): break
+            self.offsets.append(offset)
+            offset = end
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, i:int) -> GameRecord:
+        offset = self.offsets[i]
+        seed, n_rows, n_cols, n_target, first, winner, reason, n_moves = GAME.unpack_from(self.data, offset)
+        offset += GAME.size
+        moves = bytes(self.data[offset:offset + n_moves])
+        times = tuple(array('f', self.data[offset + n_moves:offset + 5 * n_moves]))
+        return GameRecord(n_rows, n_cols, n_target, seed, first, winner, REASONS[reason], moves, times)
+
+    def __iter__(self) -> Iterator[GameRecord]:
+        for i in range(len(self)): yield self[i]
+
+    def position(self, i:int, ply:int=None) -> Tuple[List[List[int]], int]:
+        '''Board and player to move of game `i` after `ply` moves (the final position if None).'''
+        return position(self[i], ply)
+
+def position(record:GameRecord, ply:int=None) -> Tuple[List[List[int]], int]:
+    '''Rebuild the board of a game after `ply` moves (the final position if None) without running
+       any player code.
+
+        Returns (Tuple[List[List[int]], int]): the board as a list of columns and the player to move.
+    '''
+    if ply is None: ply = len(record.moves)
+    board = [[] for _ in range(record.n_cols)]
+    for i, col in enumerate(record.moves[:ply]):
+        board[col].append(record.player(i))
+    return board, record.player(ply)
+
+def replay(record:GameRecord) -> Iterator[Tuple[int, int, int]]:
+    '''Replay a game move by move on a bitboard. Yields `(column, player, winner)` for every move,
+       `winner` being -1 until the move that wins.'''
+    state = Bitboard(record.n_rows, record.n_cols, record.n_target)
+    for i, col in enumerate(record.moves):
+        player = record.player(i)
+        state.push(col, player)
+        yield col, player, state.winner()
+
+
+#====================================================================================================#
+# Main Function:                                                                                     #
+#====================================================================================================#
+
+if __name__ == "__main__":
+    import argparse
+    from game import TicTacToe
+
+    parser = argparse.ArgumentParser(description='Inspect and replay recorded games.')
+    parser.add_argument('path',   help='record file')
+    parser.add_argument('--game', type=int, help='index of the game to show (default: summary of all games)')
+    parser.add_argument('--ply',  type=int, help='number of moves to replay (default: all)')
+    args = parser.parse_args()
+
+    reader = GameReader(args.path)
+
+    if args.game is None:
+        wins  = [0, 0]
+        ended = dict.fromkeys(REASONS, 0)
+        for record in reader:
+            if record.winner >= 0: wins[record.winner] += 1
+            ended[record.reason] += 1
+        print(f'{len(reader):d} games, wins {wins[0]:d} : {wins[1]:d}')
+        for reason, n in ended.items(): print(f'  {reason:>9s}: {n:d}')
+
+    else:
+        record = reader[args.game]
+        board, player = position(record, args.ply)
+
+        game = TicTacToe(n_rows=record.n_rows, n_cols=record.n_cols, n_target=record.n_target)
+        for col in range(record.n_cols):
+            for piece in board[col]: game.push(col, piece)
+
+        print(f'Game {args.game:d}: {record.n_rows:d}x{record.n_cols:d}, target {record.n_target:d}, seed {record.seed:d}, '
+              f'winner player {record.winner + 1:d} ({record.reason})')
+        print(f'Moves: {" ".join(str(c + 1) for c in record.moves)}')
+        print(game)
+        print(f"\nPlayer {player + 1:d}'s turn ({('o','x')[player]}).")
@@ -0,0 +1,163 @@
+#====================================================================================================#
+# Imports:                                                                                           #
+#====================================================================================================#
+
+import time
+import multiprocessing
+from typing import Any, List, Tuple
+
+from game import BoardView, GameContext, accepts_context, load_player
+
+
+#====================================================================================================#
+# Worker Process:                                                                                    #
+#====================================================================================================#
+
+def _worker(conn:Any, path:str) -> None:
+    '''Main loop of a player process: load the player once, then answer move requests until the
+       pipe is closed. The memory of the player never leaves the process.'''
+    play   = load_player(path)
+    memory = None
+    takes  = accepts_context(play)
+
+    while True:
+        try: request = conn.recv()
+        except EOFError: break
+        if request is None: break
+
+        board, choices, player, new_game, context = request
+        if new_game: memory = None
+
+        t = time.perf_counter()
+        try:
+            if takes and context is not None:
+                # the deadline arrives as seconds left, clocks of other processes may differ:
+                context = GameContext(*context[:4], t + context[4], context[5])
+                move, memory = play(BoardView(board), choices, player, memory, context=context)
+            else:
+                move, memory = play(BoardView(board), choices, player, memory)
+            conn.send((True, move, time.perf_counter() - t))
+
+        except Exception as e: conn.send((False, f'{type(e).__name__}: {e}', time.perf_counter() - t))
+
+
+#====================================================================================================#
+# Player Process:                                                                                    #
+#====================================================================================================#
+
+class MoveTimeout(TimeoutError):
+    '''Raised when a sandboxed player did not move in time. The game treats any `TimeoutError` of a
+       player as a timed out move.'''
+
+class PlayerError(Exception):
+    '''Raised when a sandboxed player raised an exception or its process died.'''
+
+class PlayerProcess:
+    def __init__(self, path:str, timeout:float=0, max_games:int=None) -> None:
+        '''Runs a player in its own process and can be used like its `play` function.
+
+            The process is started once and kept for all games (a new game starts whenever the
+            referee passes None as memory), only the board, the choices, the game context and the move
+            go through a pipe. If a move takes longer than `timeout`, the process is killed and `MoveTimeout` is
+            raised. It is restarted for the next move.
+
+            Arguments:
+                path        (str): file of the player (`player_<name>.py`).
+                timeout   (float): hard wall-clock limit per move in seconds (0 for no limit).
+                max_games   (int): restart the process after this many games (e.g. against memory
+                                   leaks), never if None.
+
+            Attributes:
+                overhead (List[float]): seconds per move spent outside the player (pipe and pickling)
+        '''
+        self.path      = path
+        self.timeout   = timeout
+        self.max_games = max_games
+        self.process   = None
+        self.conn      = None
+        self.games     = 0
+        self.overhead  = []
+        self.start()
+
+    def start(self) -> None:
+        '''Start (or restart) the player process.'''
+        self.stop()
+        self.conn, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_worker, args=(child, self.path), daemon=True)
+        self.process.start()
+        child.close()
+        self.games = 0
+
+    def stop(self) -> None:
+        '''Kill the player process.'''
+        if self.process is not None:
+            self.process.kill()
+            self.process.join()
+            self.conn.close()
+        self.process = None
+
+    def __call__(self, board:List[List[int]], choices:List[int], player:int, memory:Any, context:GameContext=None) -> Tuple[int, Any]:
+        if self.process is None or not self.process.is_alive(): self.start()
+
+        new_game = memory is None
+        if new_game:
+            if self.max_games is not None and self.games >= self.max_games: self.start()
+            self.games += 1
+
+        t = time.perf_counter()
+        if context is not None: context = tuple(context._replace(deadline=context.remaining()))
+        self.conn.send((tuple(board), tuple(choices), player, new_game, context))
+
+        if self.timeout > 0 and not self.conn.poll(self.timeout):
+            self.stop()
+            raise MoveTimeout(f'no move within {self.timeout:.3f} s, player process killed')
+
+        try: ok, result, think = self.conn.recv()
+        except EOFError:
+            self.stop()
+            raise PlayerError('player process died')
+
+        self.overhead.append(time.perf_counter() - t - think)
+        if not ok: raise PlayerError(result)
+
+        # the memory stays in the process, the referee only needs something that is not None:
+        return result, True
+
+    def __del__(self) -> None:
+        self.stop()
+
+
+#====================================================================================================#
+# Main Function:                                                                                     #
+#====================================================================================================#
+
+if __name__ == "__main__":
+    import argparse
+    import random
+    from game import TicTacToe
+    from benchmark import percentile
+
+    parser = argparse.ArgumentParser(description='Measure the per-move overhead of sandboxed players.')
+    parser.add_argument('--player', default='random', help='player to run in a process')
+    parser.add_argument('--moves',  type=int, default=2000, help='number of moves')
+    parser.add_argument('--size',   type=int, default=10,   help='board size')
+    args = parser.parse_args()
+
+    sandbox = PlayerProcess(f'player_{args.player}.py')
+    game = TicTacToe(n_rows=args.size, n_cols=args.size, n_target=args.size, silent=True)
+    memory = None
+
+    for _ in range(args.moves):
+        choices = game.state.choices()
+        if not choices:
+            game = TicTacToe(n_rows=args.size, n_cols=args.size, n_target=args.size, silent=True)
+            choices, memory = game.state.choices(), None
+
+        move, memory = sandbox(game.view, choices, len(game.state.moves) % 2, memory)
+        if move not in choices: move = random.choice(choices)
+        game.push(move, len(game.state.moves) % 2)
+
+    overhead = sandbox.overhead[1:]  # the first move includes loading the player
+    print(f'{len(overhead):d} moves: overhead p50 {percentile(overhead, 50)*1e3:.3f} ms, '
+          f'p99 {percentile(overhead, 99)*1e3:.3f} ms, mean {sum(overhead)/len(overhead)*1e3:.3f} ms')
+    sandbox.stop()
@@ -0,0 +1,368 @@
+#====================================================================================================#
+# Imports:                                                                                           #
+#====================================================================================================#
+
+import os
+import re
+import gzip
+import time
+import random
+import struct
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+import game
+from bitboard import Bitboard
+from events import GAME_START, MOVE_APPLIED, GAME_END
+
+
+#====================================================================================================#
+# File Format:                                                                                       #
+#====================================================================================================#
+
+# shard header (uncompressed, in the first gzip member of every shard): magic, version
+MAGIC    = b'TTTP'
+VERSION  = 1
+HEADER   = struct.Struct('<4sB3x')
+
+# position: n_rows, n_cols, n_target, player to move, outcome for the player to move (1 win, -1 loss,
+# 0 full board), column played, 64 bit key of the position. It is followed by one byte per cell,
+# column by column from the bottom (0 empty, 1 + id of the player owning the cell).
+POSITION = struct.Struct('<BBBBbBQ')
+
+# compression level of the shards (gzip members of `block_size` bytes, see `ShardWriter`).
+COMPRESSION = 6
+
+class Position(NamedTuple):
+    '''A labeled position of a self-play game.'''
+    n_rows:   int
+    n_cols:   int
+    n_target: int
+    player:   int
+    outcome:  int
+    move:     int
+    key:      int
+    board:    Tuple[Tuple[int, ...], ...]
+
+def position_key(state:Bitboard, player:int) -> int:
+    '''64 bit key of a position and its game settings as seen by `player` (see `Bitboard.canonical_key`,
+       the same for swapped colors and for the mirror image), never 0.'''
+    return hash((state.n_rows, state.n_cols, state.target, state.canonical_key(player)[0])) & 0xFFFFFFFFFFFFFFFF or 1
+
+def encode_game(n_rows:int, n_cols:int, n_target:int, first:int, moves:bytes, winner:int) -> Iterator[Tuple[int, bytes]]:
+    '''Replay a game and yield `(key, record)` for the position before every move.
+
+        Arguments:
+            n_rows, n_cols, n_target (int): board size and target of the game.
+            first                    (int): the player of the first move.
+            moves                  (bytes): the columns played.
+            winner                   (int): the winning player or -1 if the board filled up.
+    '''
+    state = Bitboard(n_rows, n_cols, n_target)
+    cells = bytearray(n_rows * n_cols)
+
+    for ply, col in enumerate(moves):
+        player  = first ^ (ply & 1)
+        outcome = 0 if winner < 0 else 1 if winner == player else -1
+        key     = position_key(state, player)
+        yield key, POSITION.pack(n_rows, n_cols, n_target, player, outcome, col, key) + cells
+
+        cells[col * n_rows + state.heights[col]] = 1 + player
+        state.push(col, player)
+
+
+#====================================================================================================#
+# Writing:                                                                                           #
+#====================================================================================================#
+
+class ShardWriter:
+    def __init__(self, directory:str, max_bytes:int=64 << 20, block_size:int=1 << 16, prefix:str='positions') -> None:
+        '''Writes position records into size capped, gzip compressed shards.
+
+            Records are collected into blocks of `block_size` bytes, and every block is compressed
+            into a gzip member of its own, so a shard is a plain gzip file and is closed before it
+            would exceed `max_bytes`. A record never spans two shards. Only one block is kept in
+            memory. Existing shards are not overwritten, numbering continues after them.
+
+            Arguments:
+                directory   (str): the directory of the shards (`<prefix>-<number>.bin.gz`).
+                max_bytes   (int): maximum compressed size of a shard.
+                block_size  (int): uncompressed size of the blocks.
+                prefix      (str): file name prefix of the shards.
+
+            Attributes:
+                paths (List[str]): the shards written so far
+        '''
+        os.makedirs(directory, exist_ok=True)
+        self.directory  = directory
+        self.max_bytes  = max_bytes
+        self.block_size = block_size
+        self.prefix     = prefix
+        self.block      = bytearray()
+        self.file       = None
+        self.size       = 0
+        self.paths      = []
+
+        expression  = re.compile(re.escape(prefix) + r'-(\d+)\.bin\.gz')
+        numbers     = [int(m[1]) for m in map(expression.fullmatch, os.listdir(directory)) if m is not None]
+        self.number = max(numbers, default=-1) + 1
+
+    def write(self, record:bytes) -> None:
+        '''Append one position record.'''
+        self.block += record
+        if len(self.block) >= self.block_size: self.flush()
+
+    def flush(self) -> None:
+        '''Compress the current block and write it to the shard (or to the next one if it is full).'''
+        if not self.block: return
+        member = gzip.compress(self.block, COMPRESSION, mtime=0)
+        self.block = bytearray()
+
+        if self.file is None or self.size + len(member) > self.max_bytes:
+            self.next()
+        self.file.write(member)
+        self.size += len(member)
+
+    def next(self) -> None:
+        '''Close the current shard and start the next one.'''
+        if self.file is not None: self.file.close()
+        path = os.path.join(self.directory, f'{self.prefix}-{self.number:05d}.bin.gz')
+        self.number += 1
+
+        self.file = open(path, 'wb')
+        self.file.write(gzip.compress(HEADER.pack(MAGIC, VERSION), COMPRESSION, mtime=0))
+        self.size = self.file.tell()
+        self.paths.append(path)
+
+    def close(self) -> None:
+        self.flush()
+        if self.file is not None: self.file.close()
+        self.file = None
+
+    def __enter__(self) -> 'ShardWriter':
+        return self
+
+    def __exit__(self, *args:Any) -> None:
+        self.close()
+
+class KeyFilter:
+    def __init__(self, slots:int=1 << 20) -> None:
+        '''Fixed size table of the keys seen so far, to drop duplicate positions in constant memory.
+
+            Every key has exactly one slot, and a new key replaces the one in its slot. Duplicates
+            are found as long as their slot was not taken over by another key meanwhile, so only a
+            few old positions are written twice.
+
+            Arguments:
+                slots (int): number of keys kept (8 bytes each), rounded up to a power of two.
+        '''
+        self.mask  = (1 << max(0, slots - 1).bit_length()) - 1
+        self.table = array('Q', bytes(8 * (self.mask + 1)))
+
+    def add(self, key:int) -> bool:
+        '''Remember a key and return whether it is new.'''
+        slot = key & self.mask
+        if self.table[slot] == key: return False
+        self.table[slot] = key
+        return True
+
+
+#====================================================================================================#
+# Reading:                                                                                           #
+#====================================================================================================#
+
+def read_shard(path:str) -> Iterator[Position]:
+    '''Stream the positions of a shard.'''
+    with gzip.open(path, 'rb') as f:
+        if HEADER.unpack(f.read(HEADER.size)) != (MAGIC, VERSION):
+            raise ValueError(f'{path} is not a position shard of version {VERSION:d}')
+
+        while True:
+            head = f.read(POSITION.size)
+            if len(head) < POSITION.size: break
+            n_rows, n_cols, n_target, player, outcome, move, key = POSITION.unpack(head)
+            cells = f.read(n_rows * n_cols)
+            board = tuple(tuple(c - 1 for c in cells[i * n_rows:(i + 1) * n_rows] if c) for i in range(n_cols))
+            yield Position(n_rows, n_cols, n_target, player, outcome, move, key, board)
+
+def read_shards(directory:str, prefix:str='positions') -> Iterator[Position]:
+    '''Stream the positions of all shards of a directory, in the order they were written.'''
+    for file in sorted(os.listdir(directory)):
+        if file.startswith(prefix + '-') and file.endswith('.bin.gz'):
+            yield from read_shard(os.path.join(directory, file))
+
+
+#====================================================================================================#
+# Self-Play:                                                                                         #
+#====================================================================================================#
+
+class _Collector:
+    '''Game hook keeping the settings, the moves and the result of the current game.'''
+
+    def __call__(self, event:str, data:Dict[str, Any]) -> None:
+        if event == MOVE_APPLIED:
+            self.moves.append(data['move'])
+
+        elif event == GAME_START:
+            self.size  = (data['n_rows'], data['n_cols'], data['n_target'])
+            self.first = data['first']
+            self.moves = bytearray()
+
+        elif event == GAME_END:
+            self.winner = data['winner']
+            self.reason = data['reason']
+
+def play_batch(job:Tuple[str, str, Tuple[int, ...], Tuple[int, ...], float]) -> Tuple[array, List[bytes], int, int, float]:
+    '''Play a batch of self-play games and encode their positions.
+
+        Arguments:
+            job (Tuple[str, str, Tuple[int, ...], Tuple[int, ...], float]): names of player 1 and 2,
+                one seed per game, the board sizes to draw from and the move timeout in seconds.
+
+        Returns (Tuple[array, List[bytes], int, int, float]): the keys and records of all positions,
+                the number of games, the number of games that were dropped (ended by an exception, a
+                timeout or an illegal move) and the seconds the batch took.
+    '''
+    name1, name2, seeds, sizes, timeout = job
+    t = time.perf_counter()
+    keys, records, dropped = array('Q'), [], 0
+    collector = _Collector()
+
+    for seed in seeds:
+        # the seed fixes board size, target, starting player and the random state of the players:
+        random.seed(seed)
+        size = random.choice(sizes)
+        match = game.TicTacToe(n_rows=size, n_cols=size, n_target=random.randint(3, size), timeout=timeout, silent=True, hooks=[collector])
+        match.start(player1=game._players[name1], player2=game._players[name2])
+
+        if collector.reason not in ('line', 'full'):
+            dropped += 1
+            continue
+
+        winner = collector.winner if collector.reason == 'line' else -1
+        for key, record in encode_game(*collector.size, collector.first, collector.moves, winner):
+            keys.append(key)
+            records.append(record)
+
+    return keys, records, len(seeds), dropped, time.perf_counter() - t
+
+def generate(name1:str, name2:str=None, directory:str='selfplay', n_positions:int=None, n_games:int=None, seed:int=None, workers:int=None, sizes:Iterable[int]=range(3, 11), timeout:float=0, max_bytes:int=64 << 20, slots:int=1 << 20, batch_seconds:float=.5, paths:List[str]=None, progress:Callable[[Dict[str, Any]], None]=None) -> Dict[str, Any]:
+    '''Let players play against each other and stream the positions of all games into shards.
+
+        Games are played in batches by a pool of worker processes. A batch grows or shrinks so that
+        it takes about `batch_seconds`, which keeps the overhead of fast players low and the memory
+        of slow ones small. Positions are labeled with the outcome of their game, deduplicated by
+        key (see `KeyFilter`) and written by a `ShardWriter`.
+
+        Arguments:
+            name1         (str): name of player 1 as returned by `import_players`
+            name2         (str): name of player 2 (self-play of player 1 if None)
+            directory     (str): directory of the shards
+            n_positions   (int): stop after this many unique positions
+            n_games       (int): stop after this many games (runs until interrupted if both are None)
+            seed          (int): seed from which the seeds of all games are drawn (random if None)
+            workers       (int): number of worker processes (all cores if None, 1 plays here)
+            sizes        (list): board sizes to draw from (the target is drawn from 3 to the size)
+            timeout     (float): time for each turn in seconds (0 for no timeout)
+            max_bytes     (int): maximum compressed size of a shard
+            slots         (int): number of keys kept to detect duplicates
+            batch_seconds (float): targeted duration of a batch
+            paths        (list): directories searched for players (see `discover_players`)
+            progress (Callable): called with the statistics after every batch
+
+        Returns (Dict[str, Any]): numbers of games, dropped games, positions and unique positions, the
+                                  shards, the seconds taken and the seed.
+    '''
+    if name2 is None: name2 = name1
+    if seed is None: seed = random.randrange(2**32)
+    if workers is None: workers = os.cpu_count() or 1
+    sizes = tuple(sizes)
+    rng   = random.Random(seed)
+
+    stats  = {'games': 0, 'dropped': 0, 'positions': 0, 'unique': 0, 'shards': [], 'seconds': 0., 'seed': seed}
+    batch  = [1]  # games per batch, adapted to the measured batch times
+    seen   = KeyFilter(slots)
+    start  = time.perf_counter()
+
+    def jobs():
+        '''Endless batches, drawn when a worker becomes free (the seeds do not depend on batching).'''
+        scheduled = 0
+        while n_games is None or scheduled < n_games:
+            n = batch[0] if n_games is None else min(batch[0], n_games - scheduled)
+            scheduled += n
+            yield name1, name2, tuple(rng.getrandbits(32) for _ in range(n)), sizes, timeout
+
+    with ShardWriter(directory, max_bytes) as writer:
+        results = game._lazy_map(play_batch, jobs(), workers, paths)
+        try:
+            for keys, records, games, dropped, seconds in results:
+                stats['games']     += games
+                stats['dropped']   += dropped
+                stats['positions'] += len(records)
+
+                for key, record in zip(keys, records):
+                    if seen.add(key):
+                        writer.write(record)
+                        stats['unique'] += 1
+                        if stats['unique'] == n_positions: break
+
+                batch[0] = max(1, min(1024, int(batch[0] * batch_seconds / max(seconds, 1e-3))))
+                stats['seconds'] = time.perf_counter() - start
+                stats['shards']  = list(writer.paths)
+                if progress is not None: progress(stats)
+                if stats['unique'] == n_positions: break
+
+        finally:
+            results.close()
+
+    stats['seconds'] = time.perf_counter() - start
+    stats['shards']  = list(writer.paths)
+    return stats
+
+
+#====================================================================================================#
+# Main Function:                                                                                     #
+#====================================================================================================#
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate labeled positions by self-play.')
+    parser.add_argument('--player1',   default='random', help='name of player 1')
+    parser.add_argument('--player2',   help='name of player 2 (default: player 1)')
+    parser.add_argument('--out',       default='selfplay', help='directory of the shards')
+    parser.add_argument('--positions', type=int, help='number of unique positions to generate')
+    parser.add_argument('--games',     type=int, help='number of games to play')
+    parser.add_argument('--sizes',     type=int, nargs='+', default=list(range(3, 11)), help='board sizes')
+    parser.add_argument('--seed',      type=int, help='seed of the games (random if omitted)')
+    parser.add_argument('--workers',   type=int, help='number of worker processes (default: all cores)')
+    parser.add_argument('--timeout',   type=float, default=0., help='move timeout in seconds (0 for no timeout)')
+    parser.add_argument('--shard-mb',  type=float, default=64., help='maximum size of a shard in MB')
+    parser.add_argument('--path',      action='append', help='additional directory with player scripts (repeatable)')
+    parser.add_argument('--read',      help='print a summary of the shards in this directory instead')
+    args = parser.parse_args()
+
+    if args.read is not None:
+        n, outcomes = 0, {1: 0, 0: 0, -1: 0}
+        for position in read_shards(args.read):
+            n += 1
+            outcomes[position.outcome] += 1
+        print(f'{n:d} positions: {outcomes[1]:d} won, {outcomes[-1]:d} lost, {outcomes[0]:d} full board (for the player to move)')
+
+    else:
+        if args.positions is None and args.games is None: args.positions = 100000
+        paths = ['.'] + args.path if args.path else None
+
+        last = [0.]
+        def report(stats):
+            if stats['seconds'] - last[0] < 5.: return
+            last[0] = stats['seconds']
+            print(f"  {stats['unique']:d} unique positions, {stats['unique'] / stats['seconds'] * 60.:.0f} per minute")
+
+        stats = generate(
+            args.player1, args.player2, args.out, args.positions, args.games, args.seed, args.workers,
+            args.sizes, args.timeout, int(args.shard_mb * (1 << 20)), paths=paths, progress=report
+        )
+        print(f"{stats['games']:d} games ({stats['dropped']:d} dropped), {stats['positions']:d} positions, "
+              f"{stats['unique']:d} unique in {len(stats['shards']):d} shards, {stats['seconds']:.1f} s "
+              f"({stats['unique'] / max(stats['seconds'], 1e-9) * 60.:.0f} unique positions per minute, seed {stats['seed']:d})")
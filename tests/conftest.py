@@ -0,0 +1,26 @@
+import os
+import random
+import sys
+
+import pytest
+
+# the modules of the project live in the repository root:
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def play_game():
+    '''Play a seeded game between two play functions and return the reason it ended.'''
+    import game
+    import player_random
+    from events import GAME_END
+
+    def play(player1, n_rows, n_cols, n_target, seed, player2=player_random.play):
+        random.seed(seed)
+        ends = []
+        match = game.TicTacToe(n_rows=n_rows, n_cols=n_cols, n_target=n_target, silent=True,
+                               hooks=[lambda event, data: ends.append(data['reason']) if event == GAME_END else None])
+        match.start(player1=player1, player2=player2)
+        return ends[0]
+
+    return play
@@ -0,0 +1,25 @@
+from analysis import analyze
+
+
+def test_tall_boards():
+    # column 0 has room above the fourth row; player 0 wins there in rows 3 to 6:
+    positions = [([[1, 0, 1, 0, 0, 0], [1], [1], []], 0), ([[0] * 8, [1], [], []], 1)]
+    results = list(analyze(positions, 4, name='ai_new', depth=2, n_rows=8))
+
+    assert results[0].move == 0
+    assert results[1].move in (1, 2, 3)
+    assert all(len(a.scores) == 4 for a in results)
+
+
+def test_game_positions_in_sequence():
+    # the last two positions of a 5x5 game with target 3 have different sides to move; analyzed in
+    # one chunk they must get the scores they get one by one:
+    moves = [3, 3, 0, 2, 4, 3, 3, 2, 3, 2]
+    positions, board = [], [[] for _ in range(5)]
+    for i, col in enumerate(moves):
+        if i >= 8: positions.append(([list(c) for c in board], i % 2))
+        board[col].append(i % 2)
+
+    together = [a.scores for a in analyze(positions, 3, depth=17)]
+    alone = [next(analyze([position], 3, depth=17)).scores for position in positions]
+    assert together == alone
@@ -0,0 +1,16 @@
+from bitboard import Bitboard
+from book import SOLVED, Solver, generate
+
+
+def test_solved_entries_keep_the_best_move():
+    # the solver table of `generate` holds this position after searching others; its best move used
+    # to be overwritten by the move of a node that failed low
+    board = [[1], [0], [0, 1, 0, 1], []]
+    entries = generate(4, 4, 3)
+
+    key, flipped = Bitboard.from_columns(board, 4, 3).canonical_key(0)
+    move, value, flags = entries[key]
+    if flipped: move = 4 - 1 - move
+
+    assert flags & SOLVED
+    assert (move, value) == Solver(4, 4, 3).solve(board, 0, 10**7) == (3, 10)
@@ -0,0 +1,25 @@
+import functools
+import glob
+import os
+
+import diagnostics
+import game
+import player_ai_new
+
+
+def test_pool_workers_write_their_logs(tmp_path, monkeypatch):
+    # (the workers are forked, so they inherit the short budget and a writer that only writes when
+    # flushed or stopped)
+    monkeypatch.setattr(player_ai_new, 'TIME_BUDGET', 0.02)
+    monkeypatch.setattr(diagnostics, 'enable', functools.partial(diagnostics.enable, interval=3600.))
+    path = str(tmp_path / 'diagnostics.log')
+
+    rounds, stats = game.tournament('ai_new', 'random', 4, seed=1, workers=2, diagnostics=(path, diagnostics.INFO))
+    assert stats['rounds'] == 4
+
+    logs = glob.glob(path + '.*')
+    assert logs
+    assert sum(os.path.getsize(log) for log in logs) > 0
+    for log in logs:
+        with open(log) as f:
+            assert all(' ai_new INFO ' in line for line in f)
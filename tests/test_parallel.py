@@ -0,0 +1,20 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import game
+import parallel
+
+
+def available(_):
+    return parallel.available()
+
+
+def test_pool_workers_stay_serial():
+    assert parallel.available()
+    assert list(game._lazy_map(available, range(2), 2)) == [False, False]
+
+    # (like the workers of a tournament)
+    with ProcessPoolExecutor(2, initializer=game._init_worker, initargs=(None, None, True)) as pool:
+        assert list(pool.map(available, range(2))) == [False, False]
+
+    # games played in this process may still start a root pool:
+    assert list(game._lazy_map(available, range(2), 1)) == [True, True]
@@ -0,0 +1,67 @@
+import game
+import player_ai_new
+
+
+def test_tall_board(monkeypatch, play_game):
+    monkeypatch.setattr(player_ai_new, 'TIME_BUDGET', 0.02)
+    for seed in range(4):
+        assert play_game(player_ai_new.play, 8, 4, 4, seed) in ('line', 'full')
+
+
+def test_wide_board(monkeypatch, play_game):
+    monkeypatch.setattr(player_ai_new, 'TIME_BUDGET', 0.02)
+    for seed in range(4):
+        assert play_game(player_ai_new.play, 3, 7, 3, seed) in ('line', 'full')
+
+
+def test_legal_move_in_tall_column():
+    # column 0 holds 5 pieces, more than the board has columns, and still has room:
+    board = [[0, 1, 0, 1, 0], [1], [], []]
+    context = game.GameContext(8, 4, 4, 0, float('inf'), 6)
+    move, memory = player_ai_new.play(board, (0, 1, 2, 3), 1, None, context)
+    assert move in (0, 1, 2, 3)
+    assert memory['stats']['depth'] > 0
+
+
+def test_table_ages_once_per_move(monkeypatch):
+    monkeypatch.setattr(player_ai_new, 'TIME_BUDGET', 0.02)
+    context = game.GameContext(5, 5, 4, 0, float('inf'), 0)
+    board = [[], [], [], [], []]
+    col, memory = player_ai_new.play(board, (0, 1, 2, 3, 4), 0, None, context)
+    age = memory['tt'].age
+
+    # the same root again (like the jobs of the parallel search), then the next move:
+    _, memory = player_ai_new.play(board, (0, 1, 2, 3, 4), 0, memory, context)
+    assert memory['tt'].age == age
+    board[col].append(0)
+    board[(col + 1) % 5].append(1)
+    _, memory = player_ai_new.play(board, (0, 1, 2, 3, 4), 0, memory, context)
+    assert memory['tt'].age == age + 1
+
+
+def test_worker_memory_per_side():
+    # a worker of the parallel search scores root moves for both seats when both are ai_new:
+    position = ((0, 1), (1,), (0,), (), ())
+
+    def jobs(player, depth):
+        return [player_ai_new._search_root((position, player, 5, 3, col, depth, float('inf')), float('-inf')) for col in range(5)]
+
+    player_ai_new._worker_memory.clear()
+    fresh = jobs(1, 2)
+    player_ai_new._worker_memory.clear()
+    jobs(0, 30)
+    assert jobs(1, 2) == fresh
+    player_ai_new._worker_memory.clear()
+
+
+def test_table_not_reused_for_the_other_side(monkeypatch):
+    monkeypatch.setattr(player_ai_new, 'TIME_BUDGET', 0.02)
+    context = game.GameContext(5, 5, 4, 0, float('inf'), 0)
+    board = [[], [], [], [], []]
+    col, memory = player_ai_new.play(board, (0, 1, 2, 3, 4), 0, None, context)
+    assert len(memory['tt'].used) > 0
+
+    # the same memory handed to the other seat (its scores have the wrong sign there):
+    board[col].append(0)
+    _, memory = player_ai_new.play(board, (0, 1, 2, 3, 4), 1, memory, context)
+    assert memory['stats']['kept'] == 0
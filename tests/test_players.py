@@ -0,0 +1,35 @@
+import pytest
+
+import game
+import player_ai
+import player_mcts
+
+
+@pytest.fixture(autouse=True)
+def short_budget(monkeypatch):
+    monkeypatch.setattr(player_mcts, 'TIME_BUDGET', 0.02)
+
+
+@pytest.mark.parametrize('have_numpy', [False, player_ai.HAVE_NUMPY])
+def test_ai_win_above_the_column_count(have_numpy, monkeypatch):
+    monkeypatch.setattr(player_ai, 'HAVE_NUMPY', have_numpy)
+    # player 0 completes a vertical line in rows 3 to 6 of a board with 8 rows and 4 columns:
+    board = [[1, 0, 1, 0, 0, 0], [1], [1], []]
+    context = game.GameContext(8, 4, 4, 0, float('inf'), 9)
+    move, _ = player_ai.play(board, (0, 1, 2, 3), 0, None, context)
+    assert move == 0
+
+
+def test_mcts_win_on_a_tall_board():
+    # with 8 rows, only column 1 wins for player 1 (the diagonal from column 0, row 2 down to
+    # column 2, row 0); read as 3 rows, the cells above row 2 run into the next column:
+    board = [[0, 0, 1, 1, 0, 1], [0], [1, 1, 0, 0]]
+    context = game.GameContext(8, 3, 3, 0, float('inf'), 12)
+    move, _ = player_mcts.play(board, (0, 1, 2), 1, None, context)
+    assert move == 1
+
+
+@pytest.mark.parametrize('play', [player_ai.play, player_mcts.play])
+def test_wide_board(play, play_game):
+    for seed in range(4):
+        assert play_game(play, 3, 7, 3, seed) in ('line', 'full')
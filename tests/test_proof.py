@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+from bitboard import Bitboard
+from book import Solver
+from proof import DRAW, LOSS, WIN, ProofSolver
+
+
+def random_position(n_rows, n_cols, n_target, rng):
+    '''A position after random moves, without a line yet.'''
+    state, board, player = Bitboard(n_rows, n_cols, n_target), [[] for _ in range(n_cols)], 0
+    for _ in range(rng.randint(0, n_rows * n_cols // 2)):
+        col = rng.choice(state.choices())
+        if state.is_win(player, state.push(col, player)): break
+        board[col].append(player)
+        player = 1 - player
+    return board, player
+
+
+@pytest.mark.parametrize('size', [(3, 3, 3), (4, 4, 3), (3, 5, 3), (5, 3, 3)])
+def test_agrees_with_the_book_solver(size):
+    rng = random.Random(sum(size))
+    values = set()
+    for _ in range(15):
+        board, player = random_position(*size, rng)
+        _, value = Solver(*size).solve(board, player, 10**8)
+        proof = ProofSolver(*size).solve(board, player)
+        assert proof.value == (WIN if value > 0 else LOSS if value < 0 else DRAW)
+        values.add(proof.value)
+
+        # the winning move completes a line or keeps the win (the opponent loses after it):
+        if proof.value == WIN:
+            state = Bitboard.from_columns(board, size[0], size[2])
+            if not state.is_win(player, state.push(proof.move, player)):
+                board[proof.move].append(player)
+                assert Solver(*size).solve(board, 1 - player, 10**8)[1] < 0
+    assert len(values) > 1
+
+
+def test_disproved_win():
+    # neither player can force a line on the empty 3x3 board:
+    assert Solver(3, 3, 3).solve([[], [], []], 0, 10**8)[1] == 0
+    solver = ProofSolver(3, 3, 3)
+    for attacker in (0, 1):
+        pn, dn, _ = solver.prove(0, attacker, float('inf'))
+        assert dn == 0 and pn > 0
+    assert solver.solve([[], [], []], 0).value == DRAW
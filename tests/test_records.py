@@ -0,0 +1,60 @@
+import random
+
+import game
+import player_random
+from events import GAME_END, GAME_START, MOVE_APPLIED
+from records import GAME, GameReader, GameRecord, GameRecorder, GameWriter, position, replay
+
+
+def test_recorded_games_replay(tmp_path):
+    path = str(tmp_path / 'games.bin')
+    games = []
+
+    def collect(event, data):
+        if event == GAME_START: games.append({'size': (data['n_rows'], data['n_cols'], data['n_target']), 'moves': []})
+        elif event == MOVE_APPLIED: games[-1]['moves'].append(data['move'])
+        elif event == GAME_END: games[-1].update(winner=data['winner'], reason=data['reason'])
+
+    for seed, (n_rows, n_cols, n_target) in enumerate([(3, 3, 3), (6, 7, 4), (8, 4, 3), (5, 5, 4), (4, 9, 3)]):
+        random.seed(seed)
+        recorder = GameRecorder(path, seed=seed)
+        match = game.TicTacToe(n_rows=n_rows, n_cols=n_cols, n_target=n_target, silent=True, hooks=[recorder, collect])
+        match.start(player1=player_random.play, player2=player_random.play)
+        recorder.close()
+
+    reader = GameReader(path)
+    assert len(reader) == len(games)
+    for seed, (record, expected) in enumerate(zip(reader, games)):
+        assert (record.n_rows, record.n_cols, record.n_target) == expected['size']
+        assert record.seed == seed
+        assert list(record.moves) == expected['moves']
+        assert (record.winner, record.reason) == (expected['winner'], expected['reason'])
+        assert len(record.times) == len(record.moves)
+
+        # replaying the moves finds the winner with the last move (and no winner before):
+        winners = [winner for _, _, winner in replay(record)]
+        assert winners[:-1] == [-1] * (len(winners) - 1)
+        assert winners[-1] == (record.winner if record.reason == 'line' else -1)
+
+        board, player = position(record)
+        assert sum(map(len, board)) == len(record.moves) and all(len(col) <= record.n_rows for col in board)
+        assert player == record.player(len(record.moves))
+
+
+def test_truncated_file(tmp_path):
+    path = str(tmp_path / 'games.bin')
+    records = [
+        GameRecord(5, 5, 4, 7, 0, 1, 'line', bytes([2, 2, 3, 3, 1, 1, 4]), (.5, .25, .5, .25, .5, .25, .5)),
+        GameRecord(3, 4, 3, -1, 1, -1, 'full', bytes([0, 1, 2, 3] * 3), (0.,) * 12),
+        GameRecord(6, 6, 4, 9, 0, 0, 'timeout', bytes([3]), (2.,)),
+    ]
+    with GameWriter(path) as writer:
+        for record in records: writer.write(record)
+
+    with open(path, 'rb') as f: data = f.read()
+    assert list(GameReader(path)) == records
+
+    # an interrupted write of the last record (in its moves, then in its header) is ignored:
+    for cut in (3, 5 * len(records[-1].moves) + GAME.size - 2):
+        with open(path, 'wb') as f: f.write(data[:-cut])
+        assert list(GameReader(path)) == records[:-1]
@@ -0,0 +1,37 @@
+import pytest
+
+from sandbox import MoveTimeout, PlayerProcess
+
+# hangs on the empty board, plays the first free column otherwise:
+SLEEPY = '''import time
+
+def play(board, choices, player, memory):
+    if sum(map(len, board)) == 0: time.sleep(60)
+    return choices[0], memory
+'''
+
+
+@pytest.fixture
+def sleepy(tmp_path):
+    path = tmp_path / 'player_sleepy.py'
+    path.write_text(SLEEPY)
+    sandbox = PlayerProcess(str(path), timeout=0.2)
+    yield sandbox
+    sandbox.stop()
+
+
+def test_killed_on_timeout(sleepy):
+    process = sleepy.process
+    with pytest.raises(MoveTimeout):
+        sleepy([[], [], []], [0, 1, 2], 0, None)
+    assert not process.is_alive()
+    assert sleepy.process is None
+
+    # the next move is answered by a fresh process:
+    assert sleepy([[0], [], []], [0, 1, 2], 1, None) == (0, True)
+    assert sleepy.process.is_alive() and sleepy.process.pid != process.pid
+
+
+def test_timeout_ends_the_game(sleepy, play_game):
+    assert play_game(sleepy, 3, 3, 3, 0) == 'timeout'
+    assert sleepy.process is None
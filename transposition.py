@@ -0,0 +1,108 @@
+#====================================================================================================#
+# Imports:                                                                                           #
+#====================================================================================================#
+
+import random
+from typing import Any, List, Tuple
+
+
+#====================================================================================================#
+# Zobrist Hashing:                                                                                   #
+#====================================================================================================#
+
+def zobrist_keys(n_cols:int, n_rows:int, seed:int=0) -> List[List[Tuple[int, int]]]:
+    '''Draw one random 64 bit key per cell and player.
+
+        Arguments:
+            n_cols  (int): number of columns of the board
+            n_rows  (int): number of rows of the board
+            seed    (int): seed of the private random generator (keeps the global state untouched)
+
+        Returns (List[List[Tuple[int, int]]]): `keys[col][row][player]`
+    '''
+    rng = random.Random(seed)
+    return [[(rng.getrandbits(64), rng.getrandbits(64)) for _ in range(n_rows)] for _ in range(n_cols)]
+
+def zobrist_hash(board:List[List[int]], keys:List[List[Tuple[int, int]]], mirrored:bool=False) -> int:
+    '''Hash a whole board. During a search the hash is updated incrementally by xor-ing the key
+       of every placed or removed piece.
+
+        The hash of the board mirrored left to right (`mirrored=True`) uses the keys of the mirrored
+        columns (`keys[-1 - col]`). The smaller of both hashes is the same for a position and its
+        mirror image, so a table keyed by it stores both of them once (see `canonical`).
+    '''
+    h = 0
+    for col, pieces in enumerate(board):
+        column = keys[-1 - col] if mirrored else keys[col]
+        for row, piece in enumerate(pieces):
+            h ^= column[row][piece]
+    return h
+
+def canonical(h:int, mirrored:int) -> Tuple[int, bool]:
+    '''The canonical hash of a position given its hash and the hash of its mirror image, and
+       whether it is the hash of the mirror image (moves stored with it are mirrored then).'''
+    return (mirrored, True) if mirrored < h else (h, False)
+
+
+#====================================================================================================#
+# Transposition Table:                                                                               #
+#====================================================================================================#
+
+# bound types of stored values:
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+class TranspositionTable:
+    def __init__(self, size_bits:int=16) -> None:
+        '''Fixed size hash table of search results.
+
+            Every hash maps to a single slot. A slot is overwritten if it is empty, holds the same
+            position, was written during an earlier search, or holds a shallower result.
+
+            Arguments:
+                size_bits (int): the table holds `2**size_bits` entries
+        '''
+        self.mask    = (1 << size_bits) - 1
+        self.entries = [None] * (1 << size_bits)
+        self.used    = set()
+        self.age     = 0
+
+    def new_search(self) -> None:
+        '''Mark all stored entries as stale so that they are replaced first.'''
+        self.age += 1
+
+    def clear(self) -> None:
+        '''Remove all entries.'''
+        self.entries = [None] * len(self.entries)
+        self.used    = set()
+
+    def get(self, key:int) -> Tuple[int, int, float, Any]:
+        '''Look up a position. Returns `(depth, flag, value, move)` or None.'''
+        entry = self.entries[key & self.mask]
+        if entry is None or entry[0] != key: return None
+        return entry[1:5]
+
+    def put(self, key:int, depth:int, flag:int, value:float, move:Any, pieces:Tuple[int, int]=None) -> None:
+        '''Store a search result of the given depth and bound type. `pieces` optionally holds one
+           bitmask of occupied cells per player, which `prune` uses to decide reachability.'''
+        i = key & self.mask
+        entry = self.entries[i]
+        if entry is None or entry[0] == key or entry[5] != self.age or entry[1] <= depth:
+            self.entries[i] = (key, depth, flag, value, move, self.age, pieces)
+            self.used.add(i)
+
+    def prune(self, pieces:Tuple[int, int], mirror:Tuple[int, int]=None) -> int:
+        '''Remove all entries that cannot be reached any more from the position given by one bitmask
+           of occupied cells per player (their positions lack some of its pieces). Entries stored
+           without pieces are kept. With the bitmasks of the mirrored position, entries reachable
+           from either are kept (for tables keyed by canonical hashes). Returns the number of
+           entries left.'''
+        p0, p1 = pieces
+        m0, m1 = mirror if mirror is not None else pieces
+        for i in list(self.used):
+            e = self.entries[i][6]
+            if e is not None and (e[0] & p0 != p0 or e[1] & p1 != p1) and (e[0] & m0 != m0 or e[1] & m1 != m1):
+                self.entries[i] = None
+                self.used.discard(i)
+        return len(self.used)